@@ -0,0 +1,194 @@
+"""Replay the site's spot lookup and add-to-cart requests without the browser
+
+The browser learns the requests once: with Chrome performance logging on, the
+XHR/fetch a date click sends (the spot-select fetch) and the one the reserve
+click sends (the add-to-cart POST) are turned into recipes with the watched
+date replaced by {date}, and saved to a JSON file. Later reservations send the
+same requests straight from an HttpPoller on the logged-in session, and the
+browser only has to load the cart page.
+
+Header values that matched a cookie when recorded (e.g. a CSRF token) are
+stored as a reference to that cookie and filled in from the current session.
+"""
+import json
+import os
+import threading
+from urllib.parse import quote, urlsplit
+
+import urllib3
+
+from http_poller import SessionExpired
+from parsing import cart_has_item, find_spot_types
+from tracing import tracer
+
+# Formats tried when finding the watched date in a recorded request
+DATE_FORMATS = ['%Y-%m-%d', '%m/%d/%Y', '%Y%m%d']
+
+# Where the site keeps the cart
+CART_PATH = '/cart/'
+
+# Recorded request headers that are replayed (cookies come from the poller)
+REPLAY_HEADERS = {'content-type', 'accept', 'x-requested-with', 'x-csrftoken', 'x-csrf-token', 'x-xsrf-token'}
+
+class ReplayFailed(Exception):
+    """Raised when a replayed request doesn't get the response the browser got"""
+
+def network_requests(log_entries):
+    """Yield the XHR and fetch requests found in Chrome performance log entries"""
+    for entry in log_entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, TypeError, ValueError):
+            continue
+        if message.get('method') != 'Network.requestWillBeSent':
+            continue
+        params = message.get('params', {})
+        if params.get('type') in ('XHR', 'Fetch'):
+            yield params['request']
+
+def templatize(text, target_dates):
+    """Replace the first watched date found in text with {date}
+
+    Returns (template, date format, url-quoted) or None.
+    """
+    for target_date in target_dates:
+        for date_format in DATE_FORMATS:
+            value = target_date.strftime(date_format)
+            for quoted, candidate in ((False, value), (True, quote(value, safe=''))):
+                if candidate in text:
+                    template = text.replace('{', '{{').replace('}', '}}').replace(candidate, '{date}')
+                    return template, date_format, quoted
+    return None
+
+def fill(template, date_format, quoted, target_date):
+    """Put a date into a recipe template"""
+    value = target_date.strftime(date_format)
+    return template.format(date=quote(value, safe='') if quoted else value)
+
+class AjaxRecipes:
+    """The learned spot lookup ('status') and add-to-cart ('cart_add') requests, kept in a JSON file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    @property
+    def complete(self):
+        return 'status' in self.entries and 'cart_add' in self.entries
+
+    def learn(self, log_entries, target_dates, cookies):
+        """Learn recipes from performance log entries; returns the names of the ones learned"""
+        learned = []
+        for request in network_requests(log_entries):
+            url = urlsplit(request['url'])
+            path = url.path + (f'?{url.query}' if url.query else '')
+            method = request.get('method', 'GET').upper()
+            body = request.get('postData') or ''
+
+            if method == 'GET' and 'status' not in self.entries:
+                found = templatize(path, target_dates)
+                if found:
+                    template, date_format, quoted = found
+                    self.entries['status'] = {'path': template, 'date_format': date_format, 'quoted': quoted}
+                    learned.append('status')
+            elif method == 'POST' and 'cart_add' not in self.entries:
+                found = templatize(body, target_dates)
+                if found:
+                    template, date_format, quoted = found
+                    self.entries['cart_add'] = {
+                        'path': path.replace('{', '{{').replace('}', '}}'),
+                        'body': template,
+                        'date_format': date_format,
+                        'quoted': quoted,
+                        'headers': self._headers(request.get('headers', {}), cookies),
+                    }
+                    learned.append('cart_add')
+
+        if learned:
+            print(f"Learned AJAX requests: {', '.join(learned)}")
+            with self.lock:
+                self._save()
+        return learned
+
+    def _headers(self, headers, cookies):
+        # Tokens that mirror a cookie are looked up again at replay time
+        by_value = {value: name for name, value in cookies.items()}
+        kept = {}
+        for name, value in headers.items():
+            if name.lower() not in REPLAY_HEADERS:
+                continue
+            kept[name] = {'cookie': by_value[value]} if value in by_value else value
+        return kept
+
+    def _save(self):
+        # Write to a temp file first so a crash never leaves half a file
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"(Could not save AJAX recipes: {e})")
+
+class AjaxReplayer:
+    """Sends the learned requests through an HttpPoller on the logged-in session"""
+
+    def __init__(self, poller, recipes):
+        self.poller = poller
+        self.recipes = recipes
+
+    def lookup_spots(self, target_date):
+        """Fetch the spot-select fragment for a date and return its spot types (e.g. ['car'])"""
+        recipe = self.recipes.entries['status']
+        with tracer.span('replay.spot_lookup') as span:
+            body = self._send('GET', fill(recipe['path'], recipe['date_format'], recipe['quoted'], target_date))
+            spot_types = find_spot_types(body)
+            span.end('found' if spot_types else 'empty')
+        return spot_types
+
+    def add_to_cart(self, target_date):
+        """POST the add-to-cart request for a date; returns the cart path to open"""
+        recipe = self.recipes.entries['cart_add']
+        headers = {}
+        for name, value in recipe['headers'].items():
+            if isinstance(value, dict):
+                value = self.poller.cookies.get(value['cookie'])
+                if value is None:
+                    raise ReplayFailed(f"Cookie for header {name} is gone")
+            headers[name] = value
+
+        with tracer.span('replay.cart_add') as span:
+            body = self._send('POST', recipe['path'].format(),
+                              fill(recipe['body'], recipe['date_format'], recipe['quoted'], target_date), headers)
+            try:
+                result = json.loads(body)
+            except ValueError:
+                result = None
+            if isinstance(result, dict) and result.get('ok') is False:
+                span.end('rejected')
+                raise ReplayFailed(f"Add to cart was rejected: {body[:200]}")
+
+            # A 200 error or login page is no success: without a JSON answer, look in the cart
+            if isinstance(result, dict) and (result.get('ok') is True or isinstance(result.get('redirect'), str)):
+                span.end('ok')
+            elif cart_has_item(self._send('GET', CART_PATH)):
+                span.end('in_cart')
+            else:
+                span.end('unconfirmed')
+                raise ReplayFailed(f"Add to cart gave no sign of success: {body[:200]}")
+
+        if isinstance(result, dict) and isinstance(result.get('redirect'), str):
+            return result['redirect']
+        return CART_PATH
+
+    def _send(self, method, path, body=None, headers=None):
+        try:
+            return self.poller.request(method, path, body, headers)
+        except (SessionExpired, urllib3.exceptions.HTTPError) as e:
+            raise ReplayFailed(f"{method} {path} failed: {e}")
@@ -0,0 +1,127 @@
+"""Count WebDriver round trips per calendar lookup, before and after the calendar index
+
+Runs against a generated calendar page (no login needed) or any --url that
+renders calendar_YYYY-MM blocks:
+
+    python benchmarks/calendar_lookup.py
+    python benchmarks/calendar_lookup.py --url http://127.0.0.1:8000/ --runs 20
+"""
+import argparse
+import calendar
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+import crystal_mountain_checker as checker
+
+class RoundTripCounter:
+    """Count every WebDriver command sent while active"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.count = 0
+        self._execute = driver.execute
+
+    def __enter__(self):
+        def counting_execute(*args, **kwargs):
+            self.count += 1
+            return self._execute(*args, **kwargs)
+        self.driver.execute = counting_execute
+        return self
+
+    def __exit__(self, *exc):
+        self.driver.execute = self._execute
+
+def legacy_find_calendar_element(driver, target_date):
+    """The per-element lookup find_calendar_element used before the index"""
+    calendar_id = checker.calendar_id_for(target_date)
+    day_elements = driver.find_elements(By.CSS_SELECTOR, f'#{calendar_id} > div')
+    for element in day_elements:
+        day_text = element.text.strip()
+        if day_text and day_text.isdigit() and int(day_text) == target_date.day:
+            return element
+    for element in day_elements:
+        data_date = element.get_attribute('data-date')
+        if data_date:
+            date_parts = data_date.split('T')[0].split('-')
+            if len(date_parts) == 3 and int(date_parts[2]) == target_date.day:
+                return element
+    return None
+
+def write_calendar_page(months):
+    """Write a static page with calendar_YYYY-MM blocks and return its file:// URL"""
+    blocks = []
+    for year, month in months:
+        # Leading blank cells like a real month grid, then one cell per day
+        first_weekday, days = calendar.monthrange(year, month)
+        cells = ['<div class="day blank"></div>'] * ((first_weekday + 1) % 7)
+        cells += [
+            f'<div class="day" data-date="{year}-{month:02d}-{day:02d}T08:00:00.000Z">{day}</div>'
+            for day in range(1, days + 1)
+        ]
+        blocks.append(f'<div id="calendar_{year}-{month:02d}">{"".join(cells)}</div>')
+
+    fd, path = tempfile.mkstemp(suffix='.html')
+    with os.fdopen(fd, 'w') as f:
+        f.write(f'<html><body><div class="calendars">{"".join(blocks)}</div></body></html>')
+    return f'file://{path}'
+
+def measure(driver, lookup, target_date, runs):
+    """Return (round trips per lookup, ms per lookup) averaged over runs"""
+    trips = 0
+    started = time.perf_counter()
+    for _ in range(runs):
+        with RoundTripCounter(driver) as counter:
+            element = lookup(driver, target_date)
+        if element is None:
+            raise RuntimeError(f"{target_date} not found on the page")
+        trips += counter.count
+    return trips / runs, (time.perf_counter() - started) * 1000 / runs
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark calendar lookup round trips')
+    parser.add_argument('--url', help='Page with calendar_YYYY-MM blocks (default: generated page)')
+    parser.add_argument('--date', help='Date to look up in MM/DD/YYYY format (default: a late day this month)')
+    parser.add_argument('--runs', type=int, default=10, help='Lookups per variant')
+    parser.add_argument('--visible', action='store_true', help='Show the browser window')
+    args = parser.parse_args()
+
+    today = datetime.date.today()
+    target_date = checker.parse_date(args.date) if args.date else today.replace(day=28)
+    next_month = (today.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+    url = args.url or write_calendar_page([(today.year, today.month), (next_month.year, next_month.month)])
+
+    options = webdriver.ChromeOptions()
+    if not args.visible:
+        options.add_argument('--headless=new')
+    driver = webdriver.Chrome(options=options)
+
+    try:
+        driver.get(url)
+        index = checker.calendar_index_for(driver)
+
+        def cold_index_lookup(driver, target_date):
+            index.token = None  # Force a rebuild, as after a refresh
+            return checker.find_calendar_element(driver, target_date)
+
+        results = [
+            ('legacy (per-element calls)', measure(driver, legacy_find_calendar_element, target_date, args.runs)),
+            ('index, rebuilt', measure(driver, cold_index_lookup, target_date, args.runs)),
+            ('index, reused', measure(driver, checker.find_calendar_element, target_date, args.runs)),
+        ]
+
+        print(f"\nCalendar lookup for {checker.format_date(target_date)} ({args.runs} runs each)")
+        print(f"{'variant':<28} {'round trips':>12} {'ms/lookup':>10}")
+        for name, (trips, ms) in results:
+            print(f"{name:<28} {trips:>12.1f} {ms:>10.1f}")
+    finally:
+        driver.quit()
+
+if __name__ == "__main__":
+    main()
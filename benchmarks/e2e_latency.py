@@ -0,0 +1,115 @@
+"""End-to-end latency of the real checker against the local mock site
+
+For each trial the mock site's clock is reset, a spot opens --open-after
+seconds later, and the checker's monitoring loop and checkout run unchanged.
+Reports time from the spot opening to detection and from detection to the
+checkout click (recorded by the mock server):
+
+    python benchmarks/e2e_latency.py --trials 5
+    python benchmarks/e2e_latency.py --engine http --poll-interval 0.5
+    python benchmarks/e2e_latency.py --watch-mode observer --scenario slow_ajax.json
+    python benchmarks/e2e_latency.py --checkout-mode both --trials 6
+    CRYSTAL_AJAX_RECIPES=mock_recipes.json python benchmarks/e2e_latency.py --reservation ajax
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_site import MockSite, load_scenario
+from scheduler import positive_seconds
+
+def run_trial(checker, site, driver, target_date, args, warm_tab):
+    """Run one open-detect-checkout cycle; returns (open->detect s, detect->checkout s) or None"""
+    site.reset()
+
+    # Start every trial from a single tab (a warm-tab checkout leaves two behind)
+    for handle in driver.window_handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(driver.window_handles[0])
+    checker.load_main_page(driver)
+
+    detected = {}
+    open_date, success = checker.monitor_for_parking(
+        driver, [target_date], 'bench', 'bench',
+        engine=args.engine,
+        poll_interval=args.poll_interval,
+        watch_mode=args.watch_mode,
+        alert=lambda date: detected.setdefault('time', time.time()),
+        warm_checkout_tab=warm_tab,
+        reservation=args.reservation,
+    )
+
+    opened = site.first_event('opened', after=site.started)
+    checkout = site.first_event('checkout', after=opened or site.started)
+    if not success or 'time' not in detected or opened is None or checkout is None:
+        return None
+    return detected['time'] - opened, checkout - detected['time']
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark detection and checkout latency against the mock site')
+    parser.add_argument('--trials', type=int, default=3)
+    parser.add_argument('--open-after', type=float, default=10, help='Seconds after each reset until a spot opens')
+    parser.add_argument('--scenario', help='Mock site scenario JSON (open_windows is replaced by --open-after)')
+    parser.add_argument('--engine', choices=['browser', 'http'], default='browser')
+    parser.add_argument('--watch-mode', choices=['refresh', 'observer'], default='refresh')
+    parser.add_argument('--poll-interval', type=positive_seconds)
+    parser.add_argument('--reservation', choices=['click', 'ajax'], default='click',
+                        help='ajax: the first trial learns the requests, later trials replay them')
+    parser.add_argument('--checkout-mode', choices=['single', 'warm', 'both'], default='single',
+                        help='Check out in the monitoring tab, in a warm cart tab, or alternate between the two')
+    parser.add_argument('--full-browser', action='store_true',
+                        help='Use the normal visible browser profile instead of lean headless mode')
+    args = parser.parse_args()
+
+    scenario = load_scenario(args.scenario) if args.scenario else {}
+    scenario['open_windows'] = [[args.open_after, args.open_after + 3600]]
+    site = MockSite(scenario).start()
+
+    # The checker reads its base URL at import time
+    os.environ['CRYSTAL_BASE_URL'] = site.base_url
+    os.environ.setdefault('CRYSTAL_AVAILABILITY_PATH', '/availability/?date={date}')
+    import crystal_mountain_checker as checker
+
+    target_date = datetime.date.today() + datetime.timedelta(days=2)
+    print(f"Mock site: {site.base_url}  scenario: {json.dumps(site.scenario)}")
+    print(f"Checker: engine={args.engine} watch_mode={args.watch_mode} "
+          f"{'full browser' if args.full_browser else 'lean'}  date={checker.format_date(target_date)}")
+
+    record_network = args.reservation == 'ajax' and not checker.ajax_recipes.complete
+    driver = checker.create_driver(lean=not args.full_browser, record_network=record_network)
+    modes = ['single', 'warm'] if args.checkout_mode == 'both' else [args.checkout_mode]
+    results = {mode: [] for mode in modes}
+    try:
+        checker.start_session(driver, 'bench', 'bench')
+        for trial in range(1, args.trials + 1):
+            mode = modes[(trial - 1) % len(modes)]
+            result = run_trial(checker, site, driver, target_date, args, mode == 'warm')
+            if result is None:
+                print(f"Trial {trial} ({mode}): checkout not reached")
+                continue
+            results[mode].append(result)
+            print(f"Trial {trial} ({mode}): open -> detect {result[0] * 1000:8.0f} ms   "
+                  f"detect -> checkout {result[1] * 1000:8.0f} ms")
+    finally:
+        driver.quit()
+        site.stop()
+
+    if any(results.values()):
+        print(f"\n{'':<30} {'median ms':>10} {'min ms':>10} {'max ms':>10}")
+        detect = [r[0] * 1000 for mode in modes for r in results[mode]]
+        print(f"{'open -> detect':<30} {statistics.median(detect):>10.0f} {min(detect):>10.0f} {max(detect):>10.0f}")
+        for mode in modes:
+            checkout = [r[1] * 1000 for r in results[mode]]
+            if checkout:
+                label = f"detect -> checkout ({mode} tab)"
+                print(f"{label:<30} {statistics.median(checkout):>10.0f} {min(checkout):>10.0f} {max(checkout):>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Replay the parsing code over saved snapshots, without a browser
+
+Runs date matching (find_watched_days), day cell classification and the
+sold-out check over every snapshot saved with --snapshots. It reports
+throughput and every decision that differs from what the live checker
+concluded when the snapshot was taken:
+
+    python benchmarks/parser_corpus.py snapshots/
+    python benchmarks/parser_corpus.py snapshots/ --repeat 20    # steadier timings
+
+It also counts matched cells whose data-date has a different UTC date part
+than the date it stands for (midnight in a zone east of UTC), where naive
+date parsing would be a day off.
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsing import classify_day_cell, data_date_day, find_watched_days, html_to_text, is_sold_out
+from snapshots import load_snapshot, snapshot_paths
+
+def replay(snapshot):
+    """Decisions the current parsing code makes for a snapshot: {iso date: decision}
+
+    The status div only holds the status of the last date clicked, so only
+    that date gets a sold_out decision.
+    """
+    watched = [datetime.date.fromisoformat(iso) for iso in snapshot['watched']]
+    cells = find_watched_days(snapshot['html']['calendars'], watched)
+    status_text = html_to_text(snapshot['html']['status']).upper()
+    shown = snapshot.get('shown')
+
+    decisions = {}
+    for target_date, cell in cells.items():
+        iso = target_date.isoformat()
+        decisions[iso] = {
+            'cell': cell,
+            'state': classify_day_cell(cell) if cell else None,
+            'sold_out': is_sold_out(status_text) if status_text and iso == shown else None,
+        }
+    return decisions
+
+def differences(recorded, replayed):
+    """Yield (date, field, recorded value, replayed value) where the replay disagrees"""
+    for iso, decision in recorded.items():
+        new = replayed.get(iso)
+        if new is None:
+            continue
+        old_cell, new_cell = decision.get('cell'), new['cell']
+        if (old_cell is None) != (new_cell is None):
+            yield iso, 'matched', bool(old_cell), bool(new_cell)
+        elif old_cell and (old_cell.get('dataDate') or '') != (new_cell.get('dataDate') or ''):
+            yield iso, 'cell', old_cell.get('dataDate'), new_cell.get('dataDate')
+        if decision.get('state') != new['state']:
+            yield iso, 'state', decision.get('state'), new['state']
+        # Only the date whose status the div shows gets a replayed sold_out decision
+        if new['sold_out'] is not None and decision.get('sold_out') != new['sold_out']:
+            yield iso, 'sold_out', decision.get('sold_out'), new['sold_out']
+
+def shifted_data_date(cell):
+    """Check whether a cell's data-date has a different UTC date part than the date it stands for"""
+    value = (cell.get('dataDate') or '').strip()
+    day = data_date_day(value)
+    return day is not None and value[:10] != day.isoformat()
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark and regression-check the parser over saved snapshots')
+    parser.add_argument('directory', help='Snapshot directory (from --snapshots)')
+    parser.add_argument('--repeat', type=int, default=1, help='Parse the corpus this many times for timing')
+    parser.add_argument('--show', type=int, default=20, help='Print at most this many differences')
+    args = parser.parse_args()
+
+    paths = snapshot_paths(args.directory)
+    if not paths:
+        print(f"No snapshots in {args.directory}")
+        return
+
+    started = time.perf_counter()
+    corpus = [(path, load_snapshot(path)) for path in paths]
+    load_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        results = [replay(snapshot) for _, snapshot in corpus]
+    parse_seconds = time.perf_counter() - started
+    parsed = len(corpus) * args.repeat
+
+    changes = []
+    shifted = 0
+    for (path, snapshot), replayed in zip(corpus, results):
+        for difference in differences(snapshot.get('decisions', {}), replayed):
+            changes.append((os.path.basename(path), snapshot['reason']) + difference)
+        shifted += sum(1 for decision in replayed.values() if decision['cell'] and shifted_data_date(decision['cell']))
+
+    reasons = {}
+    for _, snapshot in corpus:
+        reason = snapshot['reason'].split('-')[0]
+        reasons[reason] = reasons.get(reason, 0) + 1
+
+    print(f"{len(corpus)} snapshots ({', '.join(f'{name}={count}' for name, count in sorted(reasons.items()))})")
+    print(f"Load (gunzip + JSON): {len(corpus) / load_seconds:10.0f} snapshots/s")
+    print(f"Parse + classify:     {parsed / parse_seconds:10.0f} snapshots/s "
+          f"({parse_seconds / parsed * 1000:.2f} ms each)")
+    print(f"Cells whose data-date UTC day differs from the date they stand for: {shifted}")
+
+    if not changes:
+        print("Classification changes: none")
+        return
+    print(f"Classification changes: {len(changes)}")
+    for name, reason, iso, field, old, new in changes[:args.show]:
+        print(f"   {name} ({reason}) {iso} {field}: {old} -> {new}")
+    sys.exit(1)
+
+if __name__ == "__main__":
+    main()
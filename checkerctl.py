@@ -0,0 +1,71 @@
+"""Control a running checker daemon (daemon.py) over its Unix socket
+
+    python checkerctl.py add alice 03/14 03/15
+    python checkerctl.py remove alice 03/15
+    python checkerctl.py remove alice          # stop watching and close alice's browser
+    python checkerctl.py list
+    python checkerctl.py stop
+
+Requests and replies are one line of JSON each. This module only uses the
+standard library so commands start instantly.
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+
+DEFAULT_SOCKET = os.getenv('CRYSTAL_DAEMON_SOCKET', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.checker.sock'))
+
+def send_command(request, socket_path=DEFAULT_SOCKET, timeout=30):
+    """Send one request to the daemon and return its reply"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(request).encode() + b'\n')
+        with sock.makefile('r') as reply:
+            return json.loads(reply.readline())
+
+def print_watches(watches):
+    """Print the reply of a list command"""
+    if not watches:
+        print("No accounts loaded.")
+        return
+    for watch in watches:
+        rss = f"{watch['rss_mb']:.0f} MB" if watch.get('rss_mb') is not None else 'no browser'
+        print(f"{watch['account']:<16} {watch['state']:<10} {rss:>12}  {', '.join(watch['dates']) or '-'}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Control the Crystal Mountain checker daemon')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help='Daemon control socket')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    add = subparsers.add_parser('add', help='Watch dates for an account')
+    add.add_argument('account')
+    add.add_argument('dates', nargs='+', help='Dates in MM/DD or MM/DD/YYYY format')
+    remove = subparsers.add_parser('remove', help='Stop watching dates (all of them, and close the browser, if none given)')
+    remove.add_argument('account')
+    remove.add_argument('dates', nargs='*')
+    subparsers.add_parser('list', help='Show accounts, their dates and browser memory')
+    subparsers.add_parser('stop', help='Stop the daemon')
+    args = parser.parse_args()
+
+    request = {'command': args.command}
+    if args.command in ('add', 'remove'):
+        request.update(account=args.account, dates=args.dates)
+
+    try:
+        reply = send_command(request, args.socket)
+    except OSError as e:
+        print(f"Could not reach the daemon at {args.socket}: {e}")
+        sys.exit(1)
+
+    if not reply.get('ok'):
+        print(f"Error: {reply.get('error')}")
+        sys.exit(1)
+    if args.command == 'list':
+        print_watches(reply['watches'])
+    else:
+        print(reply.get('message', 'OK'))
+
+if __name__ == "__main__":
+    main()
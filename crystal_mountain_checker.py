@@ -2,20 +2,354 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, StaleElementReferenceException, NoSuchElementException
+from selenium.common.exceptions import (
+    TimeoutException, StaleElementReferenceException, NoSuchElementException, WebDriverException,
+    InvalidSessionIdException, NoSuchWindowException
+)
+from selenium.webdriver.remote.command import Command
 import time
+
+# Startup time, for reporting how long it takes to reach the first availability check
+PROCESS_STARTED = time.perf_counter()
+
 import beepy
 import os
 import argparse
 import datetime
+import json
 import threading
 import re
 import sys
+import weakref
 from dotenv import load_dotenv
+from parsing import calendar_id_for, classify_day_cell, is_sold_out, match_day_cell
+from http_poller import HttpPoller, SessionExpired, cookies_from_driver
+from selector_cache import SelectorCache
+from ajax_replay import AjaxRecipes, AjaxReplayer, ReplayFailed
+from recovery import Recovery, RecoveryFailed
+from snapshots import recorder as snapshot_recorder
+import snapshots
+from tracing import tracer
+import tracing
+from scheduler import FixedScheduler, create_scheduler, positive_number, positive_seconds
+from history import history
+import history as history_store
 
 # Load environment variables
 load_dotenv()
 
+# Override to point the checker at another server (e.g. a local copy of the site)
+BASE_URL = os.getenv('CRYSTAL_BASE_URL', 'https://parking.crystalmountainresort.com').rstrip('/')
+LOGIN_URL = f'{BASE_URL}/login/'
+MAIN_URL = f'{BASE_URL}/'
+CART_URL = f'{BASE_URL}/cart/'
+
+# Div that shows "Car Parking: SOLD OUT" (or the reserve options) for the clicked date
+STATUS_XPATH = '/html/body/div[2]/div[5]/div/div[1]'
+
+# Seconds between availability checks for each engine
+BROWSER_POLL_INTERVAL = 5
+HTTP_POLL_INTERVAL = 1
+
+# Poll interval (seconds) for every condition wait in the checkout path
+CHECKOUT_POLL_INTERVAL = 0.05
+
+# Reserve button candidates, most specific first (including fallbacks that don't depend on #spot-select)
+PARKING_BUTTON_SELECTORS = [
+    (By.CSS_SELECTOR, '#spot-select .add2cart[data-type="car"]'),
+    (By.CSS_SELECTOR, '#spot-select .spot-row[data-type="car"]'),
+    (By.XPATH, '//div[@id="spot-select"]//div[contains(@class, "add2cart") and @data-type="car"]'),
+    (By.XPATH, '//div[@id="spot-select"]//div[contains(text(), "Reserve Car Parking")]'),
+    # Fallback selectors that don't require #spot-select
+    (By.CSS_SELECTOR, '.add2cart[data-type="car"]'),
+    (By.CSS_SELECTOR, '.spot-row[data-type="car"]'),
+    (By.XPATH, '//div[contains(@class, "add2cart") and @data-type="car"]'),
+    (By.XPATH, '//*[contains(text(), "Reserve Car Parking")]'),
+    (By.XPATH, '//*[contains(text(), "Reserve car parking")]'),
+    (By.XPATH, '//*[contains(text(), "Car Parking") and (contains(@class, "add") or contains(@class, "btn") or contains(@class, "reserve"))]'),
+]
+
+# Form dropdown on the cart page
+CART_SELECT_XPATH = '/html/body/div[1]/div[1]/select'
+CART_SELECT_SELECTORS = [
+    (By.XPATH, CART_SELECT_XPATH),
+    (By.CSS_SELECTOR, 'form select'),
+]
+
+# Checkout button candidates on the cart page
+CHECKOUT_BUTTON_SELECTORS = [
+    (By.ID, 'btnCheckout'),
+    (By.XPATH, '//*[@id="btnCheckout"]'),
+    (By.XPATH, '//button[contains(translate(text(), "CHEKOUT", "chekout"), "checkout")]'),
+    (By.XPATH, '//a[contains(translate(text(), "CHEKOUT", "chekout"), "checkout")]'),
+]
+
+# Remembers which selector found each element last time (see selector_cache.py)
+SELECTOR_CACHE_PATH = os.getenv(
+    'CRYSTAL_SELECTOR_CACHE', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.selector_cache.json')
+)
+selector_cache = SelectorCache(SELECTOR_CACHE_PATH)
+
+# Learned spot lookup and add-to-cart requests for --reservation ajax
+AJAX_RECIPES_PATH = os.getenv(
+    'CRYSTAL_AJAX_RECIPES', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.ajax_recipes.json')
+)
+ajax_recipes = AjaxRecipes(AJAX_RECIPES_PATH)
+
+# Reads data-type and text of every spot row in one round trip
+SPOT_ROWS_SCRIPT = """
+return Array.from(document.querySelectorAll('#spot-select .spot-row')).map(row => ({
+    type: row.getAttribute('data-type'),
+    text: (row.innerText || '').trim()
+}));
+"""
+
+# Outer HTML of the calendars, status div and spot-select, for --snapshots
+SNAPSHOT_SCRIPT = """
+const status = document.evaluate(arguments[0], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+const spots = document.getElementById('spot-select');
+return {
+    url: location.href,
+    calendars: Array.from(document.querySelectorAll('[id^="calendar_"]')).map(c => c.outerHTML).join('\\n'),
+    status: status ? status.outerHTML : '',
+    statusText: status ? status.innerText : '',
+    spots: spots ? spots.outerHTML : ''
+};
+"""
+
+# Before a calendar click: tracks the page's fetch/XHR requests (installed once
+# per document) and watches the status container and #spot-select for changes
+ARM_STATUS_READ_SCRIPT = """
+const find = () => document.evaluate(arguments[0], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (!window.__cmRequests) {
+    const requests = window.__cmRequests = {inFlight: 0, finishedAt: 0};
+    const finished = () => { requests.inFlight = Math.max(0, requests.inFlight - 1); requests.finishedAt = performance.now(); };
+    const origFetch = window.fetch;
+    window.fetch = function() {
+        requests.inFlight++;
+        const result = origFetch.apply(this, arguments);
+        result.then(finished, finished);
+        return result;
+    };
+    const origSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        requests.inFlight++;
+        this.addEventListener('loadend', finished);
+        return origSend.apply(this, arguments);
+    };
+}
+if (window.__cmStatusRead) window.__cmStatusRead.observer.disconnect();
+const status = find();
+const state = window.__cmStatusRead = {armedAt: performance.now(), changedAt: 0, status: status};
+state.observer = new MutationObserver(() => { state.changedAt = performance.now(); });
+const spots = document.getElementById('spot-select');
+[status && (status.parentElement || status), spots].filter(Boolean).forEach(root =>
+    state.observer.observe(root, {childList: true, subtree: true, characterData: true}));
+"""
+
+# After the click: the status text once the page has reacted (a request since
+# the click or a DOM change), no request is in flight, nothing has changed for
+# arguments[1] ms and the status is visible and not a loading placeholder. After
+# arguments[2] ms (the old fixed wait) any visible status is taken, so a page
+# that keeps a request open or doesn't re-render is no slower than before.
+STATUS_READY_SCRIPT = """
+const [statusXPath, settleMs, maxWaitMs] = arguments;
+const el = document.evaluate(statusXPath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+const text = el ? (el.innerText || '').trim() : '';
+const visible = !!el && el.getClientRects().length > 0;
+const state = window.__cmStatusRead;
+const requests = window.__cmRequests;
+if (!state || !requests) return {ready: visible && !!text, text: text, visible: visible};
+
+const now = performance.now();
+if (el !== state.status && !state.changedAt) state.changedAt = now;  // Status rendered or replaced
+const reacted = state.changedAt > 0 || requests.finishedAt > state.armedAt;
+const lastActivity = Math.max(state.changedAt, requests.finishedAt);
+const settled = reacted && requests.inFlight === 0 && now - lastActivity >= settleMs;
+const ready = (settled || now - state.armedAt >= maxWaitMs)
+    && visible && !!text && !/loading|please wait/i.test(text);
+return {ready: ready, text: text, visible: visible};
+"""
+
+# Milliseconds the status must stay unchanged after the page reacts to a click,
+# and the most to wait for that before reading whatever status is shown
+STATUS_SETTLE_MS = 200
+STATUS_MAX_WAIT_MS = 3000
+
+# Seconds without any page change before observer mode falls back to a refresh
+OBSERVER_QUIET_TIMEOUT = 30
+
+# Reload the warm checkout tab after this many seconds so its session stays fresh
+WARM_TAB_MAX_AGE = 600
+
+# Path (regular expression, case-insensitive) of the page's add-to-cart request
+CART_ADD_PATH_PATTERN = os.getenv('CRYSTAL_CART_ADD_PATTERN', 'cart')
+
+# Notes when the page's add-to-cart POST (fetch or XHR) has been answered, so
+# the warm tab can take over without waiting for the monitoring tab's redirect.
+# Only same-origin POSTs whose path matches arguments[0] count, so analytics
+# beacons sent on the click don't.
+WATCH_CART_ADD_SCRIPT = """
+if (!window.__cartAddWatched) {
+  window.__cartAddWatched = true;
+  window.__cartAddDone = false;
+  const pathPattern = new RegExp(arguments[0], 'i');
+  const isCartAdd = (method, url) => {
+    if (String(method || 'GET').toUpperCase() !== 'POST') return false;
+    try {
+      const target = new URL(String(url), location.href);
+      return target.origin === location.origin && pathPattern.test(target.pathname);
+    } catch (e) {
+      return false;
+    }
+  };
+  const origFetch = window.fetch;
+  window.fetch = function(resource, init) {
+    const result = origFetch.apply(this, arguments);
+    const method = (init && init.method) || (resource && resource.method);
+    if (isCartAdd(method, resource && resource.url ? resource.url : resource)) {
+      result.then(() => { window.__cartAddDone = true; }, () => {});
+    }
+    return result;
+  };
+  const origOpen = XMLHttpRequest.prototype.open;
+  XMLHttpRequest.prototype.open = function(method, url) {
+    if (isCartAdd(method, url)) {
+      this.addEventListener('loadend', () => { window.__cartAddDone = true; });
+    }
+    return origOpen.apply(this, arguments);
+  };
+}
+"""
+
+# Fetches the cart (arguments[0]) and, when the warm tab is on the cart page,
+# swaps its DOM for the fresh copy without navigating (no new document, scripts
+# or stylesheets). Returns 'swapped', 'empty' (redirected away or no checkout
+# button: nothing was added) or 'navigate' (has an item, but the tab isn't on
+# the cart page or the fetch failed). Listeners the cart page's scripts
+# attached on load are lost with the old DOM, so checkout_from_cart reloads
+# the cart if the checkout click goes nowhere.
+REFRESH_CART_SCRIPT = """
+const cartUrl = arguments[0];
+const done = arguments[arguments.length - 1];
+fetch(cartUrl, {credentials: 'same-origin', cache: 'no-store'})
+  .then(response => response.url.indexOf('/cart') === -1 ? null : response.text())
+  .then(body => {
+    if (body === null) { done('empty'); return; }
+    const page = new DOMParser().parseFromString(body, 'text/html');
+    if (!page.getElementById('btnCheckout') && !page.querySelector('form select')) { done('empty'); return; }
+    if (location.pathname.indexOf('/cart') === -1) { done('navigate'); return; }
+    document.body.innerHTML = page.body.innerHTML;
+    done('swapped');
+  })
+  .catch(() => done('navigate'));
+"""
+
+# Extra Chrome switches for the lean performance profile
+LEAN_CHROME_ARGS = [
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-component-update',
+    '--disable-default-apps',
+    '--disable-sync',
+    '--disable-features=Translate,MediaRouter,OptimizationHints',
+    '--blink-settings=imagesEnabled=false',
+    '--mute-audio',
+    '--no-first-run',
+]
+
+# Requests blocked in lean mode: images, fonts, media and third-party analytics.
+# Stylesheets are kept because visibility checks depend on them.
+LEAN_BLOCKED_URLS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*.mp4', '*.webm', '*.mp3', '*.ogg',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*facebook.net*', '*facebook.com/tr*', '*hotjar.com*', '*clarity.ms*',
+    '*fonts.googleapis.com*', '*fonts.gstatic.com*',
+]
+
+# Used when no --date is given (the date the script was originally written for)
+DEFAULT_DATE = datetime.date(2025, 3, 29)
+
+# Returns null when no calendar is rendered, {valid: true} when the calendars
+# are unchanged since the index with the given token was built, otherwise a new
+# token plus text, data-date, class and element of every calendar_YYYY-MM day
+# cell. An in-page MutationObserver marks the index dirty on any change.
+CALENDAR_INDEX_SCRIPT = """
+const token = arguments[0];
+const state = window.__cmCalendarIndex;
+if (state && token && state.token === token && !state.dirty) return {valid: true, token: token};
+if (state) state.observer.disconnect();
+
+const calendars = Array.from(document.querySelectorAll('[id^="calendar_"]'));
+if (!calendars.length) return null;
+
+const fresh = {token: Date.now().toString(36) + Math.random().toString(36).slice(2), dirty: false};
+fresh.observer = new MutationObserver(() => { fresh.dirty = true; });
+const watched = new Set();
+calendars.forEach(calendar => {
+    fresh.observer.observe(calendar, {childList: true, subtree: true, attributes: true, characterData: true});
+    if (calendar.parentElement && !watched.has(calendar.parentElement)) {
+        // Catch whole calendars being swapped out
+        watched.add(calendar.parentElement);
+        fresh.observer.observe(calendar.parentElement, {childList: true});
+    }
+});
+window.__cmCalendarIndex = fresh;
+
+const cells = [];
+calendars.forEach(calendar => {
+    Array.from(calendar.children).filter(cell => cell.tagName === 'DIV').forEach(cell => cells.push({
+        calendarId: calendar.id,
+        element: cell,
+        text: (cell.innerText || '').trim(),
+        dataDate: cell.getAttribute('data-date') || '',
+        className: typeof cell.className === 'string' ? cell.className : '',
+        title: cell.getAttribute('title') || ''
+    }));
+});
+return {valid: false, token: fresh.token, cells: cells};
+"""
+
+# Installs a MutationObserver on the status container, #spot-select and the
+# calendars, then blocks (async script) until one of them changes or the
+# timeout passes. A status that already differs from last_text counts as a
+# change, so nothing is missed between calls.
+OBSERVE_STATUS_SCRIPT = """
+const [statusXPath, lastText, timeoutMs] = arguments;
+const done = arguments[arguments.length - 1];
+const readStatus = () => {
+    const el = document.evaluate(statusXPath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    return el ? el.innerText : null;
+};
+const spotRows = () => document.querySelectorAll('#spot-select .spot-row').length;
+const report = reason => ({reason: reason, text: readStatus(), spotRows: spotRows()});
+
+if (lastText !== null && readStatus() !== lastText) { done(report('changed')); return; }
+
+const roots = [];
+const status = document.evaluate(statusXPath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (status) roots.push(status.parentElement || status);
+const spotSelect = document.getElementById('spot-select');
+if (spotSelect) roots.push(spotSelect);
+document.querySelectorAll('[id^="calendar_"]').forEach(calendar => roots.push(calendar));
+if (!roots.length) roots.push(document.body);
+
+let finished = false;
+let timer = null;
+const observer = new MutationObserver(() => finish('mutation'));
+function finish(reason) {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    done(report(reason));
+}
+roots.forEach(root => observer.observe(root, {childList: true, subtree: true, characterData: true, attributes: true}));
+timer = setTimeout(() => finish('timeout'), timeoutMs);
+"""
+
 def play_alert():
     """Play alert sound multiple times"""
     try:
@@ -47,6 +381,19 @@ def parse_date(date_str):
     except ValueError as e:
         raise ValueError(f"Invalid date: {e}")
 
+def parse_date_range(start_str, end_str):
+    """Parse an inclusive date range into a list of dates"""
+    start = parse_date(start_str)
+    end = parse_date(end_str)
+    if end < start:
+        raise ValueError("Invalid date range: end date is before start date")
+
+    return [start + datetime.timedelta(days=i) for i in range((end - start).days + 1)]
+
+def format_date(date):
+    """Format a date as M/D/YYYY for log output"""
+    return f"{date.month}/{date.day}/{date.year}"
+
 def date_invalid(target_date):
     """Check if the given date is in the past"""
     today = datetime.date.today()
@@ -54,390 +401,1174 @@ def date_invalid(target_date):
 
     return target_date < today or target_date > next_week
 
+class CalendarIndex:
+    """date -> day cell map for every calendar on the page, reused until the DOM changes
+
+    Each lookup is a single execute_script call: it either confirms (through an
+    in-page MutationObserver) that the calendars are unchanged since the index
+    was built, or rebuilds the index from text and data-date of every day cell.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.token = None
+        self.calendars = {}
+        self.matches = {}
+
+    def sync(self):
+        """Make sure the index matches the page; returns True if it had to be rebuilt"""
+        result = self.driver.execute_script(CALENDAR_INDEX_SCRIPT, self.token)
+        if result is None:
+            # Calendars not rendered yet: wait for them, then build
+            WebDriverWait(self.driver, 5).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, '[id^="calendar_"]'))
+            )
+            result = self.driver.execute_script(CALENDAR_INDEX_SCRIPT, None)
+            if result is None:
+                raise TimeoutException("Calendars disappeared while indexing")
+
+        if result['valid']:
+            return False
+
+        self.token = result['token']
+        self.matches = {}
+        self.calendars = {}
+        for cell in result['cells']:
+            self.calendars.setdefault(cell['calendarId'], []).append(cell)
+        return True
+
+    def lookup_many(self, target_dates):
+        """Return {date: day cell dict (with 'element') or None} for the given dates"""
+        with tracer.span('calendar_lookup', dates=len(target_dates)) as span:
+            span.set(rebuilt=self.sync())
+            for target_date in target_dates:
+                if target_date not in self.matches:
+                    cells = self.calendars.get(calendar_id_for(target_date), [])
+                    self.matches[target_date] = match_day_cell(cells, target_date)
+            return {target_date: self.matches[target_date] for target_date in target_dates}
+
+    def reset(self):
+        """Forget the index so the next lookup rebuilds it"""
+        self.token = None
+        self.calendars = {}
+        self.matches = {}
+
+    def has_calendar(self, target_date):
+        """Check whether the month of the given date was on the page at the last sync"""
+        return calendar_id_for(target_date) in self.calendars
+
+# One index per live driver
+calendar_indexes = weakref.WeakKeyDictionary()
+
+def calendar_index_for(driver):
+    """Return the calendar index kept for a driver"""
+    index = calendar_indexes.get(driver)
+    if index is None:
+        index = calendar_indexes[driver] = CalendarIndex(driver)
+    return index
+
 def find_calendar_element(driver, target_date):
     """Find the calendar element for the given date"""
-    # Format for calendar element: calendar_YYYY-MM
-    calendar_id = f'calendar_{target_date.year}-{target_date.month:02d}'
-    print(f"Looking for calendar with ID: {calendar_id}")
-    
+    calendar_id = calendar_id_for(target_date)
+    index = calendar_index_for(driver)
+
     try:
-        # Wait for the calendar to be visible
-        WebDriverWait(driver, 5).until(
-            EC.presence_of_element_located((By.ID, calendar_id))
-        )
-        
-        # Find all day elements in the target month
-        day_elements = driver.find_elements(By.CSS_SELECTOR, f'#{calendar_id} > div')
-        
-        # Find the element corresponding to the target day
-        # First try to find by exact text match (most reliable)
-        for element in day_elements:
-            try:
-                day_text = element.text.strip()
-                # Check if the text is exactly the day number we're looking for
-                if day_text and day_text.isdigit() and int(day_text) == target_date.day:
-                    return element
-            except:
-                continue
-        
-        # If not found by text, try matching by data-date attribute
-        # Format: 2026-03-08T08:00:00.000Z - extract the day part properly
-        for element in day_elements:
-            try:
-                data_date = element.get_attribute('data-date')
-                if data_date:
-                    # Parse ISO date format: 2026-03-08T08:00:00.000Z
-                    # Extract day from YYYY-MM-DD part
-                    date_parts = data_date.split('T')[0].split('-')
-                    if len(date_parts) == 3:
-                        element_day = int(date_parts[2])
-                        if element_day == target_date.day:
-                            return element
-            except:
-                continue
-                
-        # If we get here, the day wasn't found but the calendar month exists
+        cell = index.lookup_many([target_date])[target_date]
+    except TimeoutException:
+        cell = None
+
+    if cell:
+        return cell['element']
+
+    if index.has_calendar(target_date):
+        # The calendar month exists but the day wasn't found
         print(f"Warning: Day {target_date.day} not found in calendar {calendar_id}.")
-        return None
-            
-    except (TimeoutException, NoSuchElementException):
+    else:
         print(f"Calendar for {target_date.month}/{target_date.year} is not available.")
         print("Crystal Mountain may not have opened reservations for this month yet.")
-        return None
+    return None
+
+def scan_watched_days(driver, target_dates):
+    """Read the day cells for all watched dates from the current page in one script call"""
+    return calendar_index_for(driver).lookup_many(target_dates)
+
+def read_date_status(driver, calendar_element):
+    """Click a calendar date and return the parking status text shown for it"""
+    with tracer.span('date_status'):
+        return click_and_read_status(driver, calendar_element)
+
+def click_and_read_status(driver, calendar_element):
+    """The steps of read_date_status
+
+    Rather than sleeping a fixed time after the click, waits until the page's
+    requests triggered by the click are answered and the status has settled,
+    so each extra watched date costs about one AJAX round trip.
+    """
+    driver.execute_script(ARM_STATUS_READ_SCRIPT, STATUS_XPATH)
+    calendar_element.click()
+
+    # Past STATUS_MAX_WAIT_MS any visible status counts, so this only times out
+    # while the status is missing, empty or still loading
+    text = checkout_wait(driver, 10).until(
+        settled_status_text, "Parking status never appeared after clicking the date"
+    )
+    return text.upper()  # Convert to uppercase for case-insensitive comparison
+
+def settled_status_text(driver):
+    """The status text once STATUS_READY_SCRIPT reports it ready, else False (a wait condition)"""
+    result = driver.execute_script(STATUS_READY_SCRIPT, STATUS_XPATH, STATUS_SETTLE_MS, STATUS_MAX_WAIT_MS)
+    return result['text'] if result['ready'] else False
+
+class StepTimer:
+    """Record how long each step of a multi-step flow takes"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.last = self.started
+        self.steps = []
+
+    def mark(self, name):
+        """Close the current step under the given name"""
+        now = time.perf_counter()
+        self.steps.append((name, now - self.last))
+        tracer.record(f"checkout.{name.replace(' ', '_')}", now - self.last)
+        self.last = now
+
+    def since(self, name):
+        """Seconds from the end of the named step until now"""
+        elapsed = 0.0
+        for step, duration in reversed(self.steps):
+            if step == name:
+                return elapsed
+            elapsed += duration
+        return time.perf_counter() - self.started
+
+    def report(self, title):
+        """Print every step with its duration"""
+        print(f"⏱  {title}:")
+        for name, duration in self.steps:
+            print(f"   {name:<24} {duration * 1000:7.0f} ms")
+        print(f"   {'total':<24} {(self.last - self.started) * 1000:7.0f} ms")
+
+class WarmCartTab:
+    """A second tab kept on the cart page next to the monitoring tab
+
+    When a date opens, the reserve click still happens on the monitoring tab,
+    but checkout continues on this tab as soon as the add-to-cart request is
+    answered: its cart DOM is refreshed in place instead of waiting for the
+    monitoring tab's redirect and cold page load.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.handle = None
+        self.monitor_handle = None
+        self.loaded_at = 0
+
+    def open(self):
+        """Open the tab on the cart page and return to the monitoring tab"""
+        self.monitor_handle = self.driver.current_window_handle
+        try:
+            self.driver.switch_to.new_window('tab')
+            self.handle = self.driver.current_window_handle
+            self.driver.get(CART_URL)
+            self.loaded_at = time.monotonic()
+            print("Warm checkout tab ready")
+        except Exception as e:
+            print(f"⚠️ Could not open the warm checkout tab: {e}")
+            self.handle = None
+        finally:
+            self.driver.switch_to.window(self.monitor_handle)
+
+    @property
+    def ready(self):
+        return self.handle is not None and self.handle in self.driver.window_handles
+
+    def keep_warm(self):
+        """Reload the tab if it is older than WARM_TAB_MAX_AGE (reopen it if it was closed)"""
+        if not self.ready:
+            self.open()
+            return
+        if time.monotonic() - self.loaded_at < WARM_TAB_MAX_AGE:
+            return
+        try:
+            self.driver.switch_to.window(self.handle)
+            self.driver.get(CART_URL)
+            self.loaded_at = time.monotonic()
+        finally:
+            self.driver.switch_to.window(self.monitor_handle)
+
+    def take_over(self):
+        """Switch to the tab and bring its cart up to date
+
+        Returns 'swapped' (cart DOM refreshed in place), 'loaded' (cart page
+        loaded normally) or 'empty' when the cart has nothing to check out.
+        """
+        self.driver.switch_to.window(self.handle)
+        self.driver.set_script_timeout(10)
+        result = self.driver.execute_async_script(REFRESH_CART_SCRIPT, CART_URL)
+        if result == 'navigate':
+            self.driver.get(CART_URL)
+            return 'loaded' if cart_has_item(self.driver) else 'empty'
+        return result
+
+    def back_to_monitor(self):
+        """Return to the monitoring tab"""
+        self.driver.switch_to.window(self.monitor_handle)
+
+    def close(self):
+        """Close the tab and return to the monitoring tab"""
+        if self.ready:
+            self.driver.switch_to.window(self.handle)
+            self.driver.close()
+            self.back_to_monitor()
+        self.handle = None
+
+def cart_add_answered(driver):
+    """Check whether the add-to-cart request has come back (or the cart page has loaded)"""
+    try:
+        return driver.execute_script("return window.__cartAddDone === true;") or reached_cart(driver)
+    except WebDriverException:
+        return False  # The page is navigating
+
+def reached_cart(driver):
+    """Check whether the add-to-cart redirect has landed on the cart page"""
+    return (
+        '/cart' in driver.current_url
+        or driver.find_elements(By.ID, 'btnCheckout')
+        or driver.find_elements(By.XPATH, CART_SELECT_XPATH)
+    )
+
+def cart_has_item(driver):
+    """Check whether the current page is a cart with something to check out"""
+    return '/cart' in driver.current_url and bool(
+        driver.find_elements(By.ID, 'btnCheckout') or driver.find_elements(By.CSS_SELECTOR, 'form select')
+    )
+
+def checkout_wait(driver, timeout):
+    """A WebDriverWait that polls every CHECKOUT_POLL_INTERVAL seconds"""
+    return WebDriverWait(driver, timeout, poll_frequency=CHECKOUT_POLL_INTERVAL)
+
+def complete_reservation(driver, target_date, warm_tab=None):
+    """Click the parking button and checkout to complete the reservation
+
+    Every step waits on a concrete DOM or URL condition (polled every
+    CHECKOUT_POLL_INTERVAL seconds) and the time spent in each step is reported.
+    With a ready WarmCartTab, checkout continues on that tab.
+    """
+    mode = 'warm_tab' if warm_tab and warm_tab.ready else 'single_tab'
+    with tracer.span('reservation', date=target_date.isoformat(), mode=mode) as span:
+        success = reserve_and_checkout(driver, target_date, warm_tab if mode == 'warm_tab' else None)
+        span.end('success' if success else 'failed')
+        return success
+
+def reserve_and_checkout(driver, target_date, warm_tab=None):
+    """The steps of complete_reservation"""
+    timer = StepTimer()
+    title = "Checkout timings (warm tab)" if warm_tab else "Checkout timings (single tab)"
+
+    def wait(timeout):
+        return checkout_wait(driver, timeout)
 
-def complete_reservation(driver, target_date):
-    """Click the parking button and checkout to complete the reservation"""
     try:
         print("Attempting to complete reservation...")
-        
-        # Wait a moment for any dynamic content to settle
-        time.sleep(2)
 
         # Wait for spot-select to be populated (AJAX fills it after calendar click)
-        spot_select = None
-        for attempt in range(5):
-            try:
-                spot_select = driver.find_element(By.ID, 'spot-select')
-                buttons = spot_select.find_elements(By.CSS_SELECTOR, '.spot-row')
-                if buttons:
-                    print(f"✅ Found spot-select with {len(buttons)} spot-row elements")
-                    for i, btn in enumerate(buttons):
-                        try:
-                            data_type = btn.get_attribute('data-type')
-                            text = btn.text[:60] if btn.text else "no text"
-                            print(f"   Row {i}: data-type={data_type}, text={text}")
-                        except Exception as ex:
-                            print(f"   Row {i}: error getting attrs: {ex}")
-                    break
-                else:
-                    print(f"   spot-select found but empty, retrying ({attempt+1}/5)...")
-            except Exception as e:
-                print(f"   spot-select not found, retrying ({attempt+1}/5)...")
-            time.sleep(1)
-        else:
-            print("❌ spot-select never populated after 5 attempts")
-        
+        try:
+            wait(5).until(lambda d: d.find_elements(By.CSS_SELECTOR, '#spot-select .spot-row'))
+            rows = driver.execute_script(SPOT_ROWS_SCRIPT)
+            print(f"✅ Found spot-select with {len(rows)} spot-row elements")
+            for i, row in enumerate(rows):
+                print(f"   Row {i}: data-type={row['type']}, text={row['text'][:60] or 'no text'}")
+        except TimeoutException:
+            print("❌ spot-select never populated after 5 seconds")
+        timer.mark('spot-select')
+
         # Click the "Reserve car parking" button
         # The actual clickable element is a div with class 'add2cart' and data-type='car'
-        parking_button = None
-        
-        # Try multiple selectors (including fallbacks that don't depend on #spot-select)
-        selectors = [
-            (By.CSS_SELECTOR, '#spot-select .add2cart[data-type="car"]'),
-            (By.CSS_SELECTOR, '#spot-select .spot-row[data-type="car"]'),
-            (By.XPATH, '//div[@id="spot-select"]//div[contains(@class, "add2cart") and @data-type="car"]'),
-            (By.XPATH, '//div[@id="spot-select"]//div[contains(text(), "Reserve Car Parking")]'),
-            # Fallback selectors that don't require #spot-select
-            (By.CSS_SELECTOR, '.add2cart[data-type="car"]'),
-            (By.CSS_SELECTOR, '.spot-row[data-type="car"]'),
-            (By.XPATH, '//div[contains(@class, "add2cart") and @data-type="car"]'),
-            (By.XPATH, '//*[contains(text(), "Reserve Car Parking")]'),
-            (By.XPATH, '//*[contains(text(), "Reserve car parking")]'),
-            (By.XPATH, '//*[contains(text(), "Car Parking") and (contains(@class, "add") or contains(@class, "btn") or contains(@class, "reserve"))]'),
-        ]
-        
-        for by, selector in selectors:
-            try:
-                parking_button = WebDriverWait(driver, 5).until(
-                    EC.element_to_be_clickable((by, selector))
-                )
-                print(f"✅ Found parking button using: {selector}")
-                break
-            except:
-                continue
-        
-        if not parking_button:
+        # All selectors are tried in one script call, the one that worked last time first
+        try:
+            parking_button = selector_cache.wait_for(
+                driver, 'main', 'parking_button', PARKING_BUTTON_SELECTORS, 5, CHECKOUT_POLL_INTERVAL
+            )
+        except TimeoutException:
             print("❌ Could not find parking button with any selector")
             return False
-        
+        timer.mark('find parking button')
+
         try:
             print(f"Clicking parking button (tag: {parking_button.tag_name})...")
             driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", parking_button)
-            time.sleep(0.5)
-            
+            if warm_tab:
+                driver.execute_script(WATCH_CART_ADD_SCRIPT, CART_ADD_PATH_PATTERN)
+
             # Click using regular click (JavaScript click might bypass the event handler)
             parking_button.click()
+            timer.mark('click reserve')
             print("✅ Clicked 'Reserve car parking' button")
-            time.sleep(3)  # Wait for AJAX call and redirect
-            
-            # Debug: Check current URL
-            current_url = driver.current_url
-            print(f"Current URL after clicking reserve: {current_url}")
-            
         except Exception as e:
             print(f"❌ Error clicking parking button: {e}")
             return False
-        
-        # Check if we're back at the calendar page
-        calendar_id = f'calendar_{target_date.year}-{target_date.month:02d}'
-        try:
-            WebDriverWait(driver, 3).until(
-                EC.presence_of_element_located((By.ID, calendar_id))
-            )
-            print("⚠️ We're back at the calendar page after clicking reserve")
-            print("The click may have triggered a page refresh. Will retry...")
-            return False
-        except:
-            # Not at calendar page, good - continue to checkout
-            pass
-        
-        # After adding to cart, we should be redirected to cart page or stay on same page
-        # The AJAX call redirects to /cart/ on success
-        # Wait for the cart page to load and click checkout
+
+        # The AJAX call redirects to /cart/ on success; if we never get there
+        # and the calendar is still showing, the click only refreshed the page
         try:
-            # First, select the last option from the form dropdown if it exists
-            # XPath: /html/body/div[1]/div[1]/select
+            wait(10).until(cart_add_answered if warm_tab else reached_cart)
+            print(f"Current URL after clicking reserve: {driver.current_url}")
+        except TimeoutException:
+            if driver.find_elements(By.ID, calendar_id_for(target_date)):
+                print("⚠️ We're back at the calendar page after clicking reserve")
+                print("The click may have triggered a page refresh. Will retry...")
+                return False
+        timer.mark('cart add' if warm_tab else 'cart redirect')
+
+        # Carry on in the warm tab while the monitoring tab is still redirecting
+        swapped_cart = False
+        if warm_tab:
             try:
-                select_element = WebDriverWait(driver, 5).until(
-                    EC.presence_of_element_located((By.XPATH, '/html/body/div[1]/div[1]/select'))
-                )
-                # Get all options and select the last one
-                options = select_element.find_elements(By.TAG_NAME, 'option')
-                if len(options) > 0:
-                    last_option = options[-1]
-                    last_option_text = last_option.text
-                    print(f"Found select dropdown with {len(options)} options, selecting last: '{last_option_text}'")
-                    last_option.click()
-                    time.sleep(1)
-                    print("✅ Selected last option from dropdown")
-                else:
-                    print("Select dropdown found but no options available")
+                cart = warm_tab.take_over()
             except Exception as e:
-                print(f"Select dropdown not found or error selecting: {e}")
-                # Continue anyway, the select might not always be present
-            
-            # Wait for either the checkout button or cart page elements
-            checkout_button = WebDriverWait(driver, 15).until(
-                EC.element_to_be_clickable((By.XPATH, '//*[@id="btnCheckout"]'))
-            )
-            print("Found checkout button, clicking...")
-            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", checkout_button)
-            time.sleep(0.5)
-            checkout_button.click()
-            print("✅ Successfully clicked checkout button!")
-            time.sleep(3)  # Wait for checkout page to load
-            return True
-        except Exception as e:
-            print(f"❌ Error clicking checkout button: {e}")
-            print("Reserve button was clicked. You may need to click checkout manually.")
-            return True  # Return True since we at least tried to reserve
-            
+                print(f"⚠️ Warm tab failed ({e}), continuing in the monitoring tab")
+                cart = None
+            if cart in ('swapped', 'loaded'):
+                swapped_cart = cart == 'swapped'
+                timer.mark('warm tab cart')
+                print("✅ Continuing checkout in the warm tab")
+            else:
+                # An empty cart means the add may have been rejected: only the
+                # monitoring tab reaching the cart proves otherwise
+                if cart == 'empty':
+                    print("⚠️ The warm tab's cart is empty, checking the monitoring tab")
+                warm_tab.back_to_monitor()
+                try:
+                    wait(10).until(cart_has_item)
+                except TimeoutException:
+                    print("❌ The spot was not added to the cart")
+                    return False
+                timer.mark('cart redirect')
+
+        return checkout_from_cart(driver, timer, reload_if_stuck=swapped_cart)
+
     except Exception as e:
         print(f"❌ Error completing reservation: {e}")
         return False
+    finally:
+        timer.report(title)
 
-def check_parking_availability(date_str=None):
-    # Get credentials from environment variables
-    username = os.getenv('CRYSTAL_USERNAME')
-    password = os.getenv('CRYSTAL_PASSWORD')
-    
-    if not username or not password:
-        raise ValueError("Missing credentials in .env file. Please set CRYSTAL_USERNAME and CRYSTAL_PASSWORD")
-    
-    # Parse date if provided
-    target_date = None
-    if date_str:
+def learn_ajax_requests(driver, target_dates):
+    """Learn the spot lookup and add-to-cart requests from the performance log, until both are known"""
+    if ajax_recipes.complete:
+        return
+    try:
+        entries = driver.get_log('performance')
+    except WebDriverException:
+        return  # The driver was started without network recording
+    ajax_recipes.learn(entries, target_dates, cookies_from_driver(driver))
+
+def replay_reservation(driver, target_date, replayer):
+    """Add a spot to the cart with the learned requests, then open the cart in the browser
+
+    Falls back to the click-driven complete_reservation when a replayed
+    request fails before anything was added.
+    """
+    timer = StepTimer()
+    with tracer.span('reservation', date=target_date.isoformat(), mode='ajax_replay') as span:
         try:
-            target_date = parse_date(date_str)
-            print(f"Checking availability for: {target_date.month}/{target_date.day}/{target_date.year}")
-            
-            if date_invalid(target_date):
-                print(f"Error: The selected date ({target_date.month}/{target_date.day}/{target_date.year}) is in the past.")
-                print("Please select a current or future date.")
-                return
-                
-        except ValueError as e:
-            print(f"Error: {e}")
-            return
-    else:
-        print("No date specified, using default date from the script")
-    
-    # Set up Chrome options
-    options = webdriver.ChromeOptions()
-    options.add_argument('--start-maximized')
-    
-    # Initialize the driver
-    driver = webdriver.Chrome(options=options)
-    
+            print("Attempting reservation over HTTP...")
+            before = cookies_from_driver(driver)
+            replayer.poller.update_cookies(before)
+
+            spot_types = replayer.lookup_spots(target_date)
+            timer.mark('replay spot lookup')
+            if 'car' not in spot_types:
+                raise ReplayFailed(f"No car spot in the spot lookup ({', '.join(spot_types) or 'empty'})")
+            print(f"✅ Spot lookup found: {', '.join(spot_types)}")
+
+            cart_path = replayer.add_to_cart(target_date)
+            timer.mark('replay cart add')
+            print("✅ Added car parking to the cart")
+        except ReplayFailed as e:
+            print(f"⚠️ {e}. Falling back to clicking through the page...")
+            span.end('fallback')
+            timer.report("Checkout timings (AJAX replay)")
+            success = complete_reservation(driver, target_date)
+            learn_ajax_requests(driver, [target_date])
+            return success
+
+        try:
+            # Carry over any cookies the server rotated, then load only the cart
+            rotated = [{'name': name, 'value': value}
+                       for name, value in replayer.poller.cookies.items() if before.get(name) != value]
+            add_cookies(driver, rotated)
+            driver.get(f'{BASE_URL}{cart_path}')
+            timer.mark('cart page')
+            success = checkout_from_cart(driver, timer, reserve_step='replay cart add')
+        except Exception as e:
+            print(f"❌ Error opening the cart: {e}")
+            print("The spot was added to the cart. Open the cart page to finish checkout.")
+            success = True
+        finally:
+            timer.report("Checkout timings (AJAX replay)")
+        span.end('success' if success else 'failed')
+        return success
+
+def cart_page_rendered(driver):
+    """Check whether the cart dropdown or the checkout button is on the page"""
+    return (
+        driver.find_elements(By.XPATH, CART_SELECT_XPATH)
+        or driver.find_elements(By.CSS_SELECTOR, 'form select')
+        or driver.find_elements(By.ID, 'btnCheckout')
+    )
+
+def select_cart_option(driver):
+    """Select the last option of the cart page dropdown, if the page has one"""
+    # The URL changes before the cart renders, so wait for the form first
     try:
-        print("Starting the parking checker...")
+        checkout_wait(driver, 5).until(cart_page_rendered)
+    except TimeoutException:
+        print("Cart page not rendered after 5 seconds, continuing")
+        return
+
+    select_element = selector_cache.resolve(
+        driver, 'cart', 'cart_select', CART_SELECT_SELECTORS, require_clickable=False
+    )
+    if not select_element:
+        print("Select dropdown not found, continuing")
+        return
+    options = select_element.find_elements(By.TAG_NAME, 'option')
+    if not options:
+        print("Select dropdown found but no options available")
+        return
+    last_option = options[-1]
+    print(f"Found select dropdown with {len(options)} options, selecting last: '{last_option.text}'")
+    last_option.click()
+    checkout_wait(driver, 2).until(lambda d: last_option.is_selected())
+    print("✅ Selected last option from dropdown")
+
+def checkout_from_cart(driver, timer, reserve_step='click reserve', reload_if_stuck=False):
+    """Pick the cart dropdown option and click checkout on the cart page
+
+    Returns True once the spot is in the cart, even if checkout needs a manual click.
+    reload_if_stuck loads the cart page properly and tries again when the
+    checkout click doesn't navigate (a cart DOM swapped in by the warm tab has
+    lost the listeners the page's scripts attached).
+    """
+    # First, select the last option from the form dropdown if it exists
+    try:
+        select_cart_option(driver)
+    except Exception as e:
+        print(f"Select dropdown not found or error selecting: {e}")
+        # Continue anyway, the select might not always be present
+    timer.mark('select option')
+
+    try:
+        checkout_button = selector_cache.wait_for(
+            driver, 'cart', 'checkout_button', CHECKOUT_BUTTON_SELECTORS, 15, CHECKOUT_POLL_INTERVAL
+        )
+        timer.mark('find checkout button')
+        print("Found checkout button, clicking...")
+        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", checkout_button)
+        checkout_button.click()
+        timer.mark('click checkout')
+        print("✅ Successfully clicked checkout button!")
+        print(f"⏱  Reserve to checkout click: {timer.since(reserve_step) * 1000:.0f} ms")
+
+        # Wait for the checkout page to take over
+        try:
+            checkout_wait(driver, 5).until(EC.staleness_of(checkout_button))
+        except TimeoutException:
+            if reload_if_stuck:
+                print("⚠️ Checkout click did not navigate. Reloading the cart page...")
+                driver.get(CART_URL)
+                timer.mark('cart reload')
+                return checkout_from_cart(driver, timer, reserve_step)
+        timer.mark('checkout page')
+        return True
+    except Exception as e:
+        print(f"❌ Error clicking checkout button: {e}")
+        try:
+            on_cart = '/cart' in driver.current_url
+        except Exception:
+            on_cart = False
+        if not on_cart:
+            print("Not on the cart page, so the spot was probably not added.")
+            return False
+        print("The spot was added to the cart. You may need to click checkout manually.")
+        return True  # Return True since we at least tried to reserve
+
+def find_open_date(driver, target_dates):
+    """Check every watched date on the current page load
+
+    Returns (open date or None, date whose status is currently shown or None)
+    """
+    started = time.perf_counter()
+    cells = scan_watched_days(driver, target_dates)
+    scan_ms = (time.perf_counter() - started) * 1000
+    current_time = time.strftime("%H:%M:%S")
+    shown_date = None
+    statuses = {}
+
+    for target_date in target_dates:
+        cell = cells.get(target_date)
+        if not cell:
+            print(f"[{current_time}] {format_date(target_date)}: not in calendar yet")
+            continue
+
+        # Skip the click when the calendar already marks the day as sold out
+        if classify_day_cell(cell) == 'sold_out':
+            print(f"[{current_time}] {format_date(target_date)}: SOLD OUT (calendar)")
+            history.record(target_date, "SOLD OUT (CALENDAR)", scan_ms, 'calendar')
+            statuses[target_date] = "SOLD OUT (CALENDAR)"
+            continue
+
+        started = time.perf_counter()
+        div_text = read_date_status(driver, cell['element'])
+        history.record(target_date, div_text, (time.perf_counter() - started) * 1000)
+        shown_date = target_date
+        current_time = time.strftime("%H:%M:%S")
+        print(f"[{current_time}] {format_date(target_date)}: {div_text}")
+
+        statuses[target_date] = div_text
+
+        if not is_sold_out(div_text):
+            snapshot_if_changed(driver, target_dates, cells, statuses, shown_date)
+            return target_date, shown_date
+
+    snapshot_if_changed(driver, target_dates, cells, statuses, shown_date)
+    return None, shown_date
+
+def snapshot_if_changed(driver, target_dates, cells, statuses, shown_date, page=None):
+    """Save a snapshot when any watched date's status differs from last time (--snapshots)"""
+    if not snapshot_recorder.enabled:
+        return
+    changed = [d for d, status in statuses.items() if snapshot_recorder.changed(d, status)]
+    if changed:
+        save_snapshot(driver, 'transition', target_dates, cells, statuses, shown_date, page)
+
+def http_snapshot_page(poller):
+    """The calendar page the HTTP poller last fetched, in the shape SNAPSHOT_SCRIPT returns"""
+    return {'url': f'{poller.base_url}{poller.calendar_path}', 'calendars': poller.last_html}
+
+def save_snapshot(driver, reason, target_dates, cells=None, statuses=None, shown_date=None, page=None):
+    """Save the page's calendar, status and spot-select HTML with what the checker made of them
+
+    shown_date is the date whose status the status div holds (the last one clicked).
+    page is taken from the browser unless given (the HTTP engine passes its own).
+    """
+    if not snapshot_recorder.enabled:
+        return
+    try:
+        if page is None:
+            page = driver.execute_script(SNAPSHOT_SCRIPT, STATUS_XPATH)
+    except Exception as e:
+        # A dead chromedriver raises urllib3 errors; leave those to the recovery ladder
+        print(f"(Could not take a snapshot: {e.__class__.__name__})")
+        return
+
+    decisions = {}
+    for target_date, cell in (cells or {}).items():
+        status = (statuses or {}).get(target_date)
+        decisions[target_date.isoformat()] = {
+            'cell': {key: cell.get(key) for key in ('text', 'dataDate', 'className', 'title')} if cell else None,
+            'state': classify_day_cell(cell) if cell else None,
+            'status': status,
+            'sold_out': is_sold_out(status) if status is not None else None,
+        }
+    snapshot_recorder.save(reason, page, list(target_dates), decisions, shown_date)
+
+def watch_for_opening(driver, target_dates, shown_date, quiet_timeout):
+    """Block on a MutationObserver until a watched date looks open
+
+    Returns (date, status) for a date that looks open, or (None, None) once
+    the page has gone quiet_timeout seconds without a change and needs a
+    refresh. status is the shown date's open status text, set only once its
+    spot rows are on the page; a date returned without one must be read again
+    before checkout.
+    """
+    deadline = time.monotonic() + quiet_timeout
+    driver.set_script_timeout(quiet_timeout + 5)
+    last_text = None
+
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None, None
+
+        with tracer.span('observer_wait') as span:
+            result = driver.execute_async_script(OBSERVE_STATUS_SCRIPT, STATUS_XPATH, last_text, int(remaining * 1000))
+            span.end(result['reason'])
+        if result['reason'] == 'timeout':
+            return None, None
+
+        # Quiet means quiet since the last change
+        deadline = time.monotonic() + quiet_timeout
+        current_time = time.strftime("%H:%M:%S")
+        last_text = result['text']
+        div_text = (last_text or '').upper()
+        print(f"[{current_time}] Page changed ({result['reason']}): {div_text}")
+        if shown_date and div_text and (is_sold_out(div_text) or result['spotRows'] > 0):
+            history.record(shown_date, div_text, source='observer')
+
+        # The status div still belongs to the last date we clicked. Text
+        # without spot rows may be a placeholder mid-refresh ("Loading..."):
+        # wait for the next change, which the spot rows arriving will be
+        if shown_date and div_text and not is_sold_out(div_text):
+            if result['spotRows'] > 0:
+                return shown_date, div_text
+            continue
+
+        # Calendar markup may have flipped for another watched date
+        cells = scan_watched_days(driver, target_dates)
+        for target_date, cell in cells.items():
+            if cell and classify_day_cell(cell) == 'available':
+                return target_date, None
+
+def login(driver, username, password):
+    """Log in through the login page form"""
+    with tracer.span('login'):
         # Navigate to the login page
-        driver.get('https://parking.crystalmountainresort.com/login/')
+        driver.get(LOGIN_URL)
         print("Loaded login page")
-        
+
         # Wait for and click the first button
         first_button = WebDriverWait(driver, 10).until(
             EC.element_to_be_clickable((By.XPATH, '/html/body/div[1]/div[1]/div/div[1]/button[1]'))
         )
         first_button.click()
-        
+
         # Fill in username and password
         username_field = WebDriverWait(driver, 10).until(
             EC.presence_of_element_located((By.XPATH, '/html/body/div[1]/div[1]/div/div[2]/form[1]/div[2]/div/input[1]'))
         )
         password_field = driver.find_element(By.XPATH, '/html/body/div[1]/div[1]/div/div[2]/form[1]/div[2]/div/input[2]')
-        
+
         username_field.send_keys(username)
         password_field.send_keys(password)
-        
+
         # Submit the form
         password_field.submit()
-        
-        # Wait after login
-        time.sleep(2)
-        
+
+        # Wait until the site has taken us off the login page
+        try:
+            WebDriverWait(driver, 10, poll_frequency=0.1).until(lambda d: '/login' not in d.current_url)
+        except TimeoutException:
+            print("Warning: still on the login page after submitting credentials")
+
+def create_driver(profile_dir=None, lean=False, record_network=False):
+    """Start Chrome, optionally with a persistent user-data-dir and the lean performance profile
+
+    Lean mode runs headless with the eager page-load strategy, blocks images,
+    fonts, media and third-party trackers over CDP, and turns off extensions and
+    background networking. record_network turns on Chrome performance logging
+    so the AJAX requests behind a reservation can be learned.
+    """
+    # Set up Chrome options
+    options = webdriver.ChromeOptions()
+
+    if record_network:
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+    if lean:
+        options.add_argument('--headless=new')
+        options.add_argument('--window-size=1366,900')
+        options.page_load_strategy = 'eager'  # Don't wait for subresources
+        for arg in LEAN_CHROME_ARGS:
+            options.add_argument(arg)
+    else:
+        options.add_argument('--start-maximized')
+
+    # A dedicated profile keeps cookies between runs (one running checker per directory)
+    if profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+        options.add_argument(f'--user-data-dir={os.path.abspath(profile_dir)}')
+
+    # Initialize the driver
+    driver = webdriver.Chrome(options=options)
+    driver_settings[driver] = (options, lean)
+    configure_driver(driver, lean)
+    return driver
+
+# Options each driver was created with, for restart_browser
+driver_settings = weakref.WeakKeyDictionary()
+
+def configure_driver(driver, lean=False):
+    """Per-session setup that Chrome options can't express"""
+    if lean:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': LEAN_BLOCKED_URLS})
+
+def restart_browser(driver):
+    """Replace the browser behind a driver with a fresh one, keeping the driver object
+
+    The old browser session is ended and a new one is started through the
+    same chromedriver, so everything holding this driver keeps working.
+    Returns the old session's cookies (empty if the browser was already gone).
+    """
+    options, lean = driver_settings[driver]
+    try:
+        cookies = driver.get_cookies()
+    except WebDriverException:
+        cookies = []
+    try:
+        driver.execute(Command.QUIT)  # Ends the browser but leaves chromedriver running
+    except WebDriverException:
+        pass
+
+    driver.start_session(options.to_capabilities())
+    configure_driver(driver, lean)
+    calendar_indexes.pop(driver, None)
+    return cookies
+
+def handoff_to_visible_browser(driver, profile_dir=None):
+    """Reopen the current page in a normal visible Chrome with the same session
+
+    Used after a lean (headless) checkout so a person can finish payment. The
+    lean driver is closed first so the profile directory is free.
+    """
+    url = driver.current_url
+    cookies = driver.get_cookies()
+    driver.quit()
+
+    print("Opening a visible browser for checkout...")
+    visible_driver = create_driver(profile_dir)
+    visible_driver.get(MAIN_URL)
+    add_cookies(visible_driver, cookies)
+    visible_driver.get(url)
+    return visible_driver
+
+def add_cookies(driver, cookies):
+    """Add cookies to the driver (the site must already be loaded); returns how many were accepted"""
+    added = 0
+    for cookie in cookies:
+        # Chrome only accepts an integer expiry
+        if 'expiry' in cookie:
+            cookie['expiry'] = int(cookie['expiry'])
+        # Cookies for another domain (e.g. saved against a different CRYSTAL_BASE_URL) are skipped
+        try:
+            driver.add_cookie(cookie)
+            added += 1
+        except Exception:
+            continue
+    return added
+
+def save_session_cookies(driver, path):
+    """Save the driver's cookies so the next run can skip the login"""
+    try:
+        with open(path, 'w') as f:
+            json.dump(driver.get_cookies(), f)
+    except OSError as e:
+        print(f"(Could not save session cookies: {e})")
+
+def load_session_cookies(driver, path):
+    """Add saved cookies to the driver (the site must already be loaded); returns True if any were accepted"""
+    try:
+        with open(path) as f:
+            cookies = json.load(f)
+    except (OSError, ValueError):
+        return False
+
+    return add_cookies(driver, cookies) > 0
+
+def session_is_valid(driver):
+    """Check whether the current page was served to a logged-in user"""
+    if '/login' in driver.current_url:
+        return False
+    if driver.find_elements(By.CSS_SELECTOR, 'a[href*="/login"]'):
+        return False
+    return bool(driver.find_elements(By.CSS_SELECTOR, '[id^="calendar_"]'))
+
+def load_main_page(driver):
+    """Navigate to the main (calendar) page"""
+    with tracer.span('main_page'):
+        driver.get(MAIN_URL)
+
+def start_session(driver, username, password, cookie_path=None):
+    """Load the main page logged in, reusing a saved session when it is still valid"""
+    with tracer.span('session_start') as span:
+        if cookie_path:
+            load_main_page(driver)
+            if session_is_valid(driver):
+                print("✅ Reusing browser profile session")
+                span.end('reused_profile')
+                return
+            if load_session_cookies(driver, cookie_path):
+                load_main_page(driver)
+                if session_is_valid(driver):
+                    print("✅ Reusing saved session cookies")
+                    span.end('reused_cookies')
+                    return
+            print("Saved session has expired. Logging in...")
+
+        login(driver, username, password)
+
         # Navigate to main page
         print("Navigating to main page...")
-        driver.get('https://parking.crystalmountainresort.com/')
-        time.sleep(2)  # Wait for page load
-        
-        # Find and click the calendar date
-        if target_date:
-            print(f"Looking for date: {target_date.month}/{target_date.day}/{target_date.year}")
-            calendar_element = find_calendar_element(driver, target_date)
-            if not calendar_element:
-                print("Error: Could not find the requested date in the available calendars.")
-                print("Please check if this date is available for booking.")
-                return
-            
-            print(f"Found calendar element, clicking...")
-            calendar_element.click()
-        else:
-            # Default to the original calendar date if no date provided
-            print("Using default date selector...")
-            try:
-                calendar_date = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, '#calendar_2025-03 > div:nth-child(29)'))
-                )
-                calendar_date.click()
-            except TimeoutException:
-                print("Error: Default date (March 29, 2025) is not available in the calendar.")
-                print("Please specify a date using the --date argument.")
-                return
-        
-        # Now begin the monitoring loop
-        print("Starting to monitor for parking availability...")
-        
-        # Track if we need to (re)click the calendar date
-        needs_date_click = False
+        load_main_page(driver)
+
+        if cookie_path:
+            save_session_cookies(driver, cookie_path)
+        span.end('login')
+
+# Recovery steps that load a page, so repeated failures back off through the scheduler
+PAGE_LOAD_RECOVERY_STEPS = {'soft_navigate', 'refresh', 'restart'}
+
+def create_recovery(driver, username, password):
+    """Recovery ladder for a monitoring driver: requery, reclick, soft_navigate, refresh, restart"""
+    def requery():
+        # Fresh element references on the next lookup; costs no round trip
+        calendar_index_for(driver).reset()
+
+    def reclick():
+        # Make sure the page is intact, then retry the clicks without reloading
+        index = calendar_index_for(driver)
+        index.reset()
+        index.sync()
+        if not driver.find_elements(By.XPATH, STATUS_XPATH):
+            raise NoSuchElementException("Status div is gone")
+
+    def ensure_logged_in():
+        WebDriverWait(driver, 10, poll_frequency=CHECKOUT_POLL_INTERVAL).until(
+            lambda d: '/login' in d.current_url or d.find_elements(By.CSS_SELECTOR, '[id^="calendar_"]')
+        )
+        if not session_is_valid(driver):
+            login(driver, username, password)
+        calendar_index_for(driver).reset()
+
+    def soft_navigate():
+        # A normal navigation reuses cached scripts and styles, unlike a refresh
+        load_main_page(driver)
+        ensure_logged_in()
+
+    def refresh():
+        driver.refresh()
+        ensure_logged_in()
+
+    def restart():
+        cookies = restart_browser(driver)
+        load_main_page(driver)
+        add_cookies(driver, cookies)
+        load_main_page(driver)
+        ensure_logged_in()
+
+    return Recovery(
+        [('requery', requery), ('reclick', reclick), ('soft_navigate', soft_navigate),
+         ('refresh', refresh), ('restart', restart)],
+        start_levels={InvalidSessionIdException: 'restart', NoSuchWindowException: 'restart'},
+    )
+
+def wait_for_http_opening(driver, poller, target_dates, scheduler, username, password, stop_event=None):
+    """Poll over HTTP until a watched date looks open and return it (None if stopped)"""
+    while not (stop_event and stop_event.is_set()):
+        try:
+            open_date, status = poller.find_open_date(target_dates)
+            snapshot_if_changed(driver, target_dates, poller.last_cells, poller.last_statuses, None,
+                                http_snapshot_page(poller))
+            if open_date:
+                print(f"HTTP poll found {format_date(open_date)}: {status}")
+                scheduler.record('open')
+                return open_date
+            scheduler.record('sold_out')
+        except SessionExpired as e:
+            print(f"{e}. Logging in again...")
+            login(driver, username, password)
+            poller.update_cookies(cookies_from_driver(driver))
+            continue
+        except Exception as e:
+            current_time = time.strftime("%H:%M:%S")
+            print(f"[{current_time}] HTTP poll failed: {str(e)}")
+            save_snapshot(driver, f'error-http-{type(e).__name__}', target_dates, page=http_snapshot_page(poller))
+            scheduler.record('error')
+            scheduler.wait(stop_event, scheduler.retry_delay())
+            continue
+
+        scheduler.wait(stop_event)
+    return None
+
+def monitor_for_parking(driver, target_dates, username, password, engine='browser', poll_interval=None,
+                        watch_mode='refresh', claims=None, alert=None, stop_event=None, scheduler=None,
+                        warm_checkout_tab=False, reservation='click'):
+    """Watch the dates on a logged-in driver and try to reserve the first one that opens
+
+    claims (optional) coordinates several monitors: dates it reports as taken
+    are no longer watched, and a date must be claimed before checkout starts.
+    alert is called with the open date (default: play the alert sound).
+    scheduler decides the wait between checks (default: a fixed poll_interval,
+    see scheduler.py). warm_checkout_tab keeps a WarmCartTab open for checkout.
+    reservation='ajax' replays the learned AJAX requests instead of clicking
+    once they are known (see ajax_replay.py), and learns them until then.
+
+    target_dates is read again every cycle, so a caller may add or remove
+    dates while monitoring runs (see daemon.py).
+
+    Returns (date, success) after a reservation attempt, or (None, False) when
+    stopped or when every date has been taken elsewhere.
+    """
+    print(f"Starting to monitor for parking availability ({engine} engine)...")
+    
+    if scheduler is None:
+        if poll_interval is None:
+            poll_interval = HTTP_POLL_INTERVAL if engine == 'http' else BROWSER_POLL_INTERVAL
+        scheduler = FixedScheduler(poll_interval)
+    
+    # The HTTP engine reuses the browser's login cookies and only hands
+    # control back to the browser once a date looks open
+    poller = None
+    if engine == 'http':
+        poller = HttpPoller.from_driver(
+            driver, BASE_URL, availability_path=os.getenv('CRYSTAL_AVAILABILITY_PATH'),
+            unknown_recheck=BROWSER_POLL_INTERVAL,
+        )
+        if not poller.availability_path:
+            print(f"No CRYSTAL_AVAILABILITY_PATH set: dates the calendar doesn't mark are "
+                  f"confirmed in the browser at most every {BROWSER_POLL_INTERVAL} seconds")
+    
+    replayer = None
+    if reservation == 'ajax':
+        replayer = AjaxReplayer(poller or HttpPoller.from_driver(driver, BASE_URL), ajax_recipes)
+    
+    warm_tab = None
+    if warm_checkout_tab:
+        warm_tab = WarmCartTab(driver)
+        warm_tab.open()
+    
+    recovery = create_recovery(driver, username, password)
+    
+    # Track if we need to reload the page before the next check
+    needs_refresh = False
+    
+    while not (stop_event and stop_event.is_set()):
+        # Stop watching dates that another monitor has already booked
+        watched_dates = [d for d in target_dates if not (claims and claims.taken(d))]
+        if not watched_dates:
+            print("All watched dates are taken elsewhere (booked or being checked out). Stopping.")
+            if warm_tab:
+                warm_tab.close()
+            recovery.report()
+            return None, False
         
-        while True:
-            try:
-                # If we need to click the date (first run or after refresh), find and click it
-                if needs_date_click:
-                    print("Re-finding and clicking calendar date...")
-                    calendar_element = find_calendar_element(driver, target_date)
-                    if calendar_element:
-                        calendar_element.click()
-                        print("Clicked calendar date, waiting for page to load...")
-                    else:
-                        print("Warning: Could not find calendar date element, retrying...")
-                        time.sleep(2)
-                        continue
-                    needs_date_click = False
-                
-                # Wait for page load after click
-                time.sleep(2)
-                
-                # Wait for the parking status div
-                target_div = WebDriverWait(driver, 10).until(
-                    EC.visibility_of_element_located((By.XPATH, '/html/body/div[2]/div[5]/div/div[1]'))
-                )
-                
-                # Wait a moment for any dynamic content to load
-                time.sleep(1)
+        # One span per monitoring cycle (for the HTTP engine it includes the HTTP polls)
+        span = tracer.span('poll', engine=engine, dates=len(watched_dates))
+        try:
+            if poller:
+                candidate = wait_for_http_opening(driver, poller, watched_dates, scheduler, username, password,
+                                                  stop_event)
+                if candidate is None:
+                    span.end('stopped')
+                    break
                 
-                # Try multiple times to get the text in case of stale element
-                max_retries = 3
-                for attempt in range(max_retries):
-                    try:
-                        div_text = target_div.text.upper()  # Convert to uppercase for case-insensitive comparison
-                        break
-                    except StaleElementReferenceException:
-                        if attempt == max_retries - 1:
-                            raise
-                        time.sleep(1)
-                        target_div = WebDriverWait(driver, 10).until(
-                            EC.visibility_of_element_located((By.XPATH, '/html/body/div[2]/div[5]/div/div[1]'))
-                        )
+                # Confirm on the live page before starting checkout
+                load_main_page(driver)
+                open_date, _ = find_open_date(driver, [candidate])
+                recovery.reset()
+                if replayer:
+                    learn_ajax_requests(driver, [candidate])
+                if open_date is None:
+                    span.end('sold_out')
+                    poller.confirmed_sold_out(candidate)
+                    scheduler.record('sold_out')
+                    print("Browser still shows sold out. Resuming HTTP polling...")
+                    scheduler.wait(stop_event)
+                    continue
+            else:
+                if needs_refresh:
+                    driver.refresh()  # The calendar lookup waits for the calendars to render
+                    needs_refresh = False
                 
-                current_time = time.strftime("%H:%M:%S")
-                print(f"[{current_time}] Current text: {div_text}")  # Debug output
+                # One page load covers every watched date
+                open_date, shown_date = find_open_date(driver, watched_dates)
+                recovery.reset()
+                if replayer:
+                    learn_ajax_requests(driver, watched_dates)
                 
-                if "SOLD OUT" in div_text or "Car Parking: SOLD OUT" in div_text:
-                    print(f"[{current_time}] Still sold out. Waiting 5 seconds before checking again...")
-                    time.sleep(5)  # Wait 5 seconds before rechecking
-                    driver.refresh()
-                    time.sleep(2)  # Wait for page to load
-                    needs_date_click = True  # Need to click date after refresh
-                    continue
-                else:
-                    print("\n🎉 FOUND AVAILABLE PARKING! 🎉")
-                    
-                    # Play alert sound in background (non-blocking)
-                    threading.Thread(target=play_alert, daemon=True).start()
-                    
-                    # Attempt to complete the reservation
-                    success = complete_reservation(driver, target_date)
-                    
-                    if success:
-                        print("\n✅ Reservation process initiated successfully!")
-                        print("Please check the browser to confirm and complete any remaining steps.")
-                        print("Browser window will remain open. Press Ctrl+C to exit.")
-                    else:
-                        print("\n⚠️ Could not complete reservation automatically.")
-                        print("Browser window will remain open for manual completion.")
-                        print("Press Ctrl+C to exit.")
-                    
-                    # Keep the browser window open indefinitely
-                    while True:
-                        try:
-                            time.sleep(1)
-                        except KeyboardInterrupt:
-                            print("\nScript stopped by user. Closing browser...")
-                            return  # Exit the function completely
-                    
-            except TimeoutException:
-                current_time = time.strftime("%H:%M:%S")
-                print(f"[{current_time}] Timeout occurred. Refreshing...")
-                driver.refresh()
-                time.sleep(2)
-                needs_date_click = True  # Need to click date after refresh
-                continue
-            except StaleElementReferenceException:
+                # Wait for the page itself to change instead of sleeping and refreshing
+                if open_date is None and watch_mode == 'observer':
+                    candidate, status = watch_for_opening(driver, watched_dates, shown_date, OBSERVER_QUIET_TIMEOUT)
+                    if status:
+                        open_date = candidate
+                        if snapshot_recorder.enabled:
+                            snapshot_if_changed(driver, watched_dates, scan_watched_days(driver, watched_dates),
+                                                {candidate: status}, candidate)
+                    elif candidate:
+                        open_date, shown_date = find_open_date(driver, [candidate])
+                    if open_date is None:
+                        span.end('quiet')
+                        scheduler.record('sold_out')
+                        current_time = time.strftime("%H:%M:%S")
+                        if candidate:
+                            print(f"[{current_time}] {format_date(candidate)} is still sold out. Refreshing...")
+                        else:
+                            print(f"[{current_time}] No changes for {OBSERVER_QUIET_TIMEOUT} seconds. Refreshing...")
+                        needs_refresh = True
+                        continue
+            
+            if open_date is None:
+                span.end('sold_out')
+                scheduler.record('sold_out')
+                delay = scheduler.next_delay()
                 current_time = time.strftime("%H:%M:%S")
-                print(f"[{current_time}] Page was updating, retrying...")
-                time.sleep(2)
-                needs_date_click = True  # Need to click date after page update
+                print(f"[{current_time}] Still sold out. Waiting {delay:.1f} seconds before checking again...")
+                scheduler.wait(stop_event, delay)  # Wait before rechecking
+                if warm_tab:
+                    warm_tab.keep_warm()
+                needs_refresh = True
                 continue
-            except Exception as e:
-                current_time = time.strftime("%H:%M:%S")
-                print(f"[{current_time}] Unexpected error: {str(e)}")
-                print("Refreshing page...")
-                driver.refresh()
-                time.sleep(2)
-                needs_date_click = True  # Need to click date after refresh
+            
+            if claims and not claims.claim(open_date):
+                span.end('claimed_elsewhere')
+                print(f"{format_date(open_date)} is already being booked elsewhere. Continuing...")
+                needs_refresh = True
                 continue
+            
+            span.end('open')
+            scheduler.record('open')
+            print(f"\n🎉 FOUND AVAILABLE PARKING FOR {format_date(open_date)}! 🎉")
+            
+            if alert:
+                alert(open_date)
+            else:
+                # Play alert sound in background (non-blocking)
+                threading.Thread(target=play_alert, daemon=True).start()
+            
+            # Attempt to complete the reservation
+            if replayer and ajax_recipes.complete:
+                success = replay_reservation(driver, open_date, replayer)
+            else:
+                success = complete_reservation(driver, open_date, warm_tab)
+                if replayer:
+                    learn_ajax_requests(driver, [open_date])
+            if claims and not success:
+                claims.release(open_date)
+            recovery.report()
+            return open_date, success
+        
+        # Recover with the cheapest step that hasn't been tried since the last good check
+        except TimeoutException as e:
+            span.end('timeout')
+            scheduler.record('timeout')
+            current_time = time.strftime("%H:%M:%S")
+            print(f"[{current_time}] Timeout occurred.")
+            error = e
+        except StaleElementReferenceException as e:
+            span.end('stale')
+            current_time = time.strftime("%H:%M:%S")
+            print(f"[{current_time}] Page was updating.")
+            error = e
+        except Exception as e:
+            span.end('error')
+            scheduler.record('error')
+            current_time = time.strftime("%H:%M:%S")
+            print(f"[{current_time}] Unexpected error: {str(e)}")
+            error = e
+        
+        save_snapshot(driver, f'error-{type(error).__name__}', watched_dates)
+        needs_refresh = False
+        try:
+            step = recovery.recover(error)
+        except RecoveryFailed as e:
+            # e.g. the network is down: keep trying from a browser restart, backing off each time
+            scheduler.record('error')
+            delay = scheduler.retry_delay()
+            current_time = time.strftime("%H:%M:%S")
+            print(f"[{current_time}] {e}. Trying again in {delay:.1f} seconds...")
+            scheduler.wait(stop_event, delay)
+            continue
+        print(f"Recovered with {step} step, retrying...")
+        if step in PAGE_LOAD_RECOVERY_STEPS:
+            scheduler.wait(stop_event)  # Backs off after repeated failures
+    
+    if warm_tab:
+        warm_tab.close()
+    recovery.report()
+    return None, False
+
+def check_parking_availability(date_strs=None, date_range=None, engine='browser', poll_interval=None,
+                               watch_mode='refresh', profile_dir=None, lean=False, trace_file=None,
+                               scheduler=None, history_file=None, warm_checkout_tab=False, reservation='click',
+                               snapshot_dir=None):
+    # Get credentials from environment variables
+    username = os.getenv('CRYSTAL_USERNAME')
+    password = os.getenv('CRYSTAL_PASSWORD')
+    
+    if not username or not password:
+        raise ValueError("Missing credentials in .env file. Please set CRYSTAL_USERNAME and CRYSTAL_PASSWORD")
+    
+    # A single date string is still accepted for backwards compatibility
+    if isinstance(date_strs, str):
+        date_strs = [date_strs]
+
+    # Parse dates if provided
+    target_dates = []
+    if date_strs or date_range:
+        try:
+            for date_str in date_strs or []:
+                target_dates.append(parse_date(date_str))
+            if date_range:
+                target_dates.extend(parse_date_range(*date_range))
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+
+        target_dates = sorted(set(target_dates))
+        for target_date in target_dates:
+            if date_invalid(target_date):
+                print(f"Error: The selected date ({format_date(target_date)}) is in the past.")
+                print("Please select a current or future date.")
+                return
+
+        print(f"Checking availability for: {', '.join(format_date(d) for d in target_dates)}")
+    else:
+        print("No date specified, using default date from the script")
+        target_dates = [DEFAULT_DATE]
+    
+    if trace_file:
+        tracing.configure(trace_file)
+    if history_file:
+        history_store.configure(history_file)
+    if snapshot_dir:
+        snapshots.configure(snapshot_dir)
+    
+    # Chrome only records network requests when asked at startup
+    record_network = reservation == 'ajax' and not ajax_recipes.complete
+    if record_network:
+        print("Recording network requests to learn the reservation AJAX calls")
+    driver = create_driver(profile_dir, lean, record_network)
+    cookie_path = os.path.join(profile_dir, 'session_cookies.json') if profile_dir else None
+    
+    try:
+        print("Starting the parking checker...")
+        start_session(driver, username, password, cookie_path)
+        
+        # Make sure at least one of the requested dates is on the calendar
+        try:
+            cells = scan_watched_days(driver, target_dates)
+        except TimeoutException:
+            cells = {}
+        print(f"⏱  Startup to first availability check: {time.perf_counter() - PROCESS_STARTED:.1f} s")
+        if not any(cells.values()):
+            print("Error: Could not find the requested dates in the available calendars.")
+            print("Crystal Mountain may not have opened reservations for these months yet.")
+            return
+        
+        open_date, success = monitor_for_parking(driver, target_dates, username, password, engine, poll_interval,
+                                                 watch_mode, scheduler=scheduler, warm_checkout_tab=warm_checkout_tab,
+                                                 reservation=reservation)
+        
+        # Payment needs a person, so leave the headless browser behind
+        if lean:
+            driver = handoff_to_visible_browser(driver, profile_dir)
+        
+        if success:
+            print("\n✅ Reservation process initiated successfully!")
+            print("Please check the browser to confirm and complete any remaining steps.")
+            print("Browser window will remain open. Press Ctrl+C to exit.")
+        else:
+            print("\n⚠️ Could not complete reservation automatically.")
+            print("Browser window will remain open for manual completion.")
+            print("Press Ctrl+C to exit.")
+        
+        # Keep the browser window open indefinitely
+        while True:
+            time.sleep(1)
                 
     except KeyboardInterrupt:
         print("\nScript stopped by user. Closing browser...")
@@ -450,10 +1581,58 @@ def check_parking_availability(date_str=None):
 if __name__ == "__main__":
     # Set up command-line argument parsing
     parser = argparse.ArgumentParser(description='Check Crystal Mountain parking availability')
-    parser.add_argument('--date', type=str, help='Date to check in MM/DD or MM/DD/YYYY format')
+    parser.add_argument('--date', type=str, action='append',
+                        help='Date to check in MM/DD or MM/DD/YYYY format (repeat to watch several dates)')
+    parser.add_argument('--date-range', type=str, nargs=2, metavar=('START', 'END'),
+                        help='Watch every date from START to END (inclusive)')
+    parser.add_argument('--engine', choices=['browser', 'http'], default='browser',
+                        help='Poll by refreshing the browser, or over HTTP with the browser login cookies')
+    parser.add_argument('--watch-mode', choices=['refresh', 'observer'], default='refresh',
+                        help='Between refreshes, sleep (refresh) or wait on a MutationObserver for page changes (observer)')
+    parser.add_argument('--profile-dir', default=os.getenv('CRYSTAL_PROFILE_DIR'),
+                        help='Persistent Chrome profile directory; reuses the saved session instead of logging in')
+    parser.add_argument('--lean', action='store_true',
+                        help='Headless, eager page loads and blocked images/fonts/trackers; opens a visible browser at checkout')
+    parser.add_argument('--warm-checkout-tab', action='store_true',
+                        help='Keep a second tab on the cart page and finish checkout there once a spot is added')
+    parser.add_argument('--reservation', choices=['click', 'ajax'], default='click',
+                        help='click: drive the page; ajax: replay the learned spot lookup and add-to-cart requests')
+    parser.add_argument('--snapshots', metavar='DIR', default=os.getenv('CRYSTAL_SNAPSHOT_DIR'),
+                        help='Save gzip HTML snapshots on every status change and error (replay with benchmarks/parser_corpus.py)')
+    parser.add_argument('--trace', metavar='FILE', default=os.getenv('CRYSTAL_TRACE_FILE'),
+                        help='Append per-phase timings as JSONL (summarize with: python tracing.py summary FILE)')
+    parser.add_argument('--poll-interval', type=positive_seconds,
+                        help=f'Seconds between checks (default: {BROWSER_POLL_INTERVAL} for browser, {HTTP_POLL_INTERVAL} for http)')
+    parser.add_argument('--scheduler', choices=['fixed', 'adaptive'], default='fixed',
+                        help='fixed: constant interval; adaptive: burst windows plus backoff with jitter after errors')
+    parser.add_argument('--burst', action='append', metavar='HH:MM-HH:MM[@SECONDS]',
+                        help='Poll every SECONDS (default 0.5) inside this daily window (adaptive scheduler, repeatable)')
+    parser.add_argument('--max-polls-per-minute', type=positive_number,
+                        help='Cap on availability checks per minute across all watched dates')
+    parser.add_argument('--history', metavar='FILE', default=os.getenv('CRYSTAL_HISTORY_FILE'),
+                        help='Record every observed status in a SQLite file (analyze with: python history.py report FILE)')
+    parser.add_argument('--burst-from-history', action='store_true',
+                        help='Add burst windows at the hours spots usually open, learned from --history (adaptive scheduler)')
     
     # Parse arguments
     args = parser.parse_args()
     
-    # Run the checker with the provided date
-    check_parking_availability(args.date) 
\ No newline at end of file
+    if (args.burst or args.burst_from_history) and args.scheduler != 'adaptive':
+        parser.error('--burst and --burst-from-history need --scheduler adaptive')
+    if args.burst_from_history and not args.history:
+        parser.error('--burst-from-history needs --history')
+    
+    try:
+        interval = args.poll_interval or (HTTP_POLL_INTERVAL if args.engine == 'http' else BROWSER_POLL_INTERVAL)
+        learned = history_store.load_burst_windows(args.history) if args.burst_from_history else []
+        if learned:
+            print(f"Burst windows from history: {', '.join(str(w) for w in learned)}")
+        scheduler = create_scheduler(args.scheduler, interval, args.burst, args.max_polls_per_minute,
+                                     burst_windows=learned)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    # Run the checker with the provided dates
+    check_parking_availability(args.date, args.date_range, args.engine, args.poll_interval, args.watch_mode,
+                               args.profile_dir, args.lean, args.trace, scheduler, args.history,
+                               args.warm_checkout_tab, args.reservation, args.snapshots) 
@@ -0,0 +1,489 @@
+"""Long-running checker with warm browsers, a control socket and a memory watchdog
+
+Start it once and add or remove watches without restarting:
+
+    python daemon.py --max-browsers 4 --lean --max-rss-mb 1500
+    python checkerctl.py add alice 03/14 03/15
+    python checkerctl.py list
+
+Each account gets one logged-in browser that watches all of its dates. The
+browser stays open (and logged in) when its last date is removed, so adding a
+date later starts polling at once. Credentials come from
+CRYSTAL_USERNAME_<ACCOUNT> and CRYSTAL_PASSWORD_<ACCOUNT>, as for
+orchestrator.py.
+
+Every WATCHDOG_INTERVAL seconds the resident memory of each browser's
+chromedriver and Chrome processes is read from /proc. A browser over
+--max-rss-mb is replaced: a new one is started and logged in with the old
+session's cookies while the old one keeps polling, and the watch switches
+over between two checks.
+"""
+import argparse
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+
+import crystal_mountain_checker as checker
+from checkerctl import DEFAULT_SOCKET
+from orchestrator import TAKEN_RECHECK_INTERVAL, AccountClaims, AlertChannel, DateClaims, credentials_for, poll_interval
+from scheduler import PollBudget, create_scheduler, positive_number, positive_seconds
+import history
+import snapshots
+import tracing
+
+# Seconds between browser memory checks
+WATCHDOG_INTERVAL = 30
+
+def process_tree(root_pid):
+    """Return root_pid and the pids of all of its descendants, read from /proc"""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The command name may contain spaces; the parent pid is the second field after it
+        ppid = int(stat.rsplit(')', 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+
+    pids, pending = [], [root_pid]
+    while pending:
+        pid = pending.pop()
+        pids.append(pid)
+        pending.extend(children.get(pid, []))
+    return pids
+
+def rss_mb(pids):
+    """Sum of VmRSS over processes, in MB (shared pages are counted once per process)"""
+    total_kb = 0
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+                        break
+        except OSError:
+            continue
+    return total_kb / 1024
+
+def browser_rss_mb(driver):
+    """Memory of a driver's chromedriver and every Chrome process under it, or None if unknown"""
+    process = getattr(getattr(driver, 'service', None), 'process', None)
+    if process is None or not os.path.isdir('/proc'):
+        return None
+    return rss_mb(process_tree(process.pid))
+
+class WatchedDates:
+    """Dates a watch is polling; monitor_for_parking re-reads them every cycle"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.dates = set()
+
+    def add(self, dates):
+        """Add dates; returns the ones that weren't watched yet"""
+        with self.lock:
+            added = set(dates) - self.dates
+            self.dates |= added
+        return sorted(added)
+
+    def remove(self, dates):
+        """Remove dates; returns the ones that were watched"""
+        with self.lock:
+            removed = set(dates) & self.dates
+            self.dates -= removed
+        return sorted(removed)
+
+    def __iter__(self):
+        with self.lock:
+            return iter(sorted(self.dates))
+
+    def __len__(self):
+        with self.lock:
+            return len(self.dates)
+
+class Watch:
+    """One account: a worker thread, its warm browser and its watched dates"""
+
+    def __init__(self, daemon, account, username, password):
+        self.daemon = daemon
+        self.account = account
+        self.username = username
+        self.password = password
+        self.dates = WatchedDates()
+        self.driver = None
+        self.replacement = None
+        self.state = 'starting'
+        self.closing = False
+        self.wake = threading.Event()  # Dates added, replacement ready or closing
+        self.stop_event = threading.Event()  # Ends the current monitoring run
+        self.thread = threading.Thread(target=self.run, name=f'watch-{account}', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def add(self, dates):
+        added = self.dates.add(dates)
+        self.wake.set()
+        return added
+
+    def remove(self, dates):
+        removed = self.dates.remove(dates)
+        if not len(self.dates):
+            self.stop_event.set()
+        return removed
+
+    def recycle(self, replacement):
+        """Switch to a freshly started browser between two checks"""
+        self.replacement = replacement
+        self.stop_event.set()
+        self.wake.set()
+
+    def close(self):
+        """Stop watching and close the browser"""
+        self.closing = True
+        self.stop_event.set()
+        self.wake.set()
+
+    def run(self):
+        try:
+            while not self.closing:
+                self.swap_in_replacement()
+                if not len(self.dates):
+                    self.state = 'idle'
+                    self.wake.wait()
+                    self.wake.clear()
+                    continue
+                if self.wait_while_taken():
+                    continue
+
+                if self.driver is None:
+                    self.state = 'starting'
+                    self.driver = self.daemon.new_browser(self.username, self.password)
+
+                self.stop_event.clear()
+                if self.closing or self.replacement:
+                    continue
+                self.state = 'watching'
+                open_date, success = checker.monitor_for_parking(
+                    self.driver, self.dates, self.username, self.password,
+                    stop_event=self.stop_event,
+                    claims=AccountClaims(self.daemon.claims, self.account),
+                    alert=lambda date: self.daemon.alerts.notify(self.account, date),
+                    **self.daemon.monitor_options(),
+                )
+                if open_date is not None:
+                    self.finish_reservation(open_date, success)
+        except Exception as e:
+            print(f"[{self.account}] Watch failed: {str(e)}")
+            self.state = 'failed'
+        finally:
+            for driver in (self.driver, self.replacement):
+                if driver is not None:
+                    try:
+                        driver.quit()
+                    except Exception:
+                        pass
+            self.driver = self.replacement = None
+            if self.state != 'failed':
+                self.state = 'closed'
+
+    def wait_while_taken(self):
+        """Drop dates other accounts have booked; True (after a wait) if the rest are all being booked elsewhere"""
+        claims = self.daemon.claims
+        booked = [d for d in self.dates if claims.is_booked(d)]
+        if booked:
+            self.dates.remove(booked)
+            print(f"[{self.account}] No longer watching {', '.join(checker.format_date(d) for d in booked)}: "
+                  f"booked by another account")
+
+        dates = list(self.dates)
+        if dates and not all(claims.taken(d) for d in dates):
+            return False
+        if dates:
+            # A checkout in progress elsewhere gives its date back if it fails
+            self.state = 'waiting'
+            self.wake.wait(TAKEN_RECHECK_INTERVAL)
+            self.wake.clear()
+        return True
+
+    def swap_in_replacement(self):
+        replacement = self.replacement
+        if replacement is None:
+            return
+        old_driver, self.driver, self.replacement = self.driver, replacement, None
+        if old_driver is not None:
+            try:
+                old_driver.quit()
+            except Exception:
+                pass
+        print(f"♻️  [{self.account}] Switched to the new browser")
+
+    def finish_reservation(self, open_date, success):
+        """Leave the checkout browser for a person and keep watching the other dates with a new one"""
+        self.dates.remove([open_date])
+        if success:
+            self.daemon.claims.mark_booked(open_date, self.account)
+            print(f"\n✅ [{self.account}] Checkout reached for {checker.format_date(open_date)}. "
+                  f"Finish payment in its browser.")
+        else:
+            print(f"\n⚠️ [{self.account}] Could not complete the reservation for "
+                  f"{checker.format_date(open_date)} automatically.")
+
+        driver, self.driver = self.driver, None
+        if self.daemon.options.lean:
+            driver = checker.handoff_to_visible_browser(driver)
+        self.daemon.open_browsers.append(driver)
+
+class CheckerDaemon:
+    """Accounts, their watches and the shared claims, alerts and poll budget"""
+
+    def __init__(self, options):
+        self.options = options
+        self.lock = threading.Lock()
+        self.watches = {}
+        self.claims = DateClaims()
+        self.alerts = AlertChannel()
+        self.open_browsers = []
+        self.stopped = threading.Event()
+        self.budget = PollBudget(options.max_polls_per_minute) if options.max_polls_per_minute else None
+
+    def monitor_options(self):
+        """Keyword arguments for monitor_for_parking (a fresh scheduler per run)"""
+        options = self.options
+        return {
+            'engine': options.engine,
+            'poll_interval': options.poll_interval,
+            'watch_mode': options.watch_mode,
+            'scheduler': create_scheduler(options.scheduler, poll_interval(options), options.burst,
+                                          budget=self.budget, burst_windows=options.learned_windows),
+            'warm_checkout_tab': options.warm_checkout_tab,
+            'reservation': options.reservation,
+        }
+
+    def new_browser(self, username, password, cookies=None):
+        """Start a logged-in browser, reusing cookies from an old one when given"""
+        record_network = self.options.reservation == 'ajax' and not checker.ajax_recipes.complete
+        driver = checker.create_driver(lean=self.options.lean, record_network=record_network)
+        try:
+            if cookies:
+                checker.load_main_page(driver)
+                checker.add_cookies(driver, cookies)
+                checker.load_main_page(driver)
+                if checker.session_is_valid(driver):
+                    print("✅ Reusing the old browser's session")
+                    return driver
+            checker.start_session(driver, username, password)
+        except Exception:
+            driver.quit()
+            raise
+        return driver
+
+    def handle(self, request):
+        """Run one control command and return the reply"""
+        command = request.get('command')
+        if command == 'add':
+            return self.add(request['account'], request.get('dates') or [])
+        if command == 'remove':
+            return self.remove(request['account'], request.get('dates') or [])
+        if command == 'list':
+            return {'ok': True, 'watches': self.describe()}
+        if command == 'stop':
+            self.stopped.set()
+            return {'ok': True, 'message': 'Stopping'}
+        return {'ok': False, 'error': f"Unknown command '{command}'"}
+
+    def add(self, account, date_strs):
+        if not date_strs:
+            raise ValueError("No dates given")
+        dates = [checker.parse_date(date_str) for date_str in date_strs]
+        for target_date in dates:
+            if checker.date_invalid(target_date):
+                raise ValueError(f"{checker.format_date(target_date)} is outside the booking window")
+
+        with self.lock:
+            watch = self.watches.get(account)
+            if watch is not None and not watch.thread.is_alive():
+                # The last watch for this account failed: start over with its dates
+                dates = list(watch.dates) + dates
+                del self.watches[account]
+                watch = None
+            if watch is None:
+                if len(self.watches) >= self.options.max_browsers:
+                    raise ValueError(f"All {self.options.max_browsers} browsers are in use. "
+                                     f"Remove an account first or raise --max-browsers")
+                username, password = credentials_for(account)
+                watch = self.watches[account] = Watch(self, account, username, password).start()
+
+        added = watch.add(dates)
+        print(f"[{account}] Watching {', '.join(checker.format_date(d) for d in watch.dates)}")
+        return {'ok': True, 'message': f"Added {len(added)} date(s) for {account}"}
+
+    def remove(self, account, date_strs):
+        with self.lock:
+            watch = self.watches.get(account)
+            if watch is None:
+                raise ValueError(f"No watch for {account}")
+            if not date_strs:
+                del self.watches[account]
+                watch.close()
+                print(f"[{account}] Closed")
+                return {'ok': True, 'message': f"Closed {account}"}
+
+        removed = watch.remove([checker.parse_date(date_str) for date_str in date_strs])
+        print(f"[{account}] Watching {', '.join(checker.format_date(d) for d in watch.dates) or 'nothing'}")
+        return {'ok': True, 'message': f"Removed {len(removed)} date(s) for {account}"}
+
+    def describe(self):
+        with self.lock:
+            watches = list(self.watches.values())
+        return [{
+            'account': watch.account,
+            'state': watch.state,
+            'dates': [checker.format_date(d) for d in watch.dates],
+            'rss_mb': browser_rss_mb(watch.driver) if watch.driver is not None else None,
+        } for watch in watches]
+
+    def watchdog(self):
+        """Replace browsers whose memory has grown past --max-rss-mb"""
+        while not self.stopped.wait(WATCHDOG_INTERVAL):
+            with self.lock:
+                watches = list(self.watches.values())
+            for watch in watches:
+                driver = watch.driver
+                if driver is None or watch.replacement is not None or watch.state not in ('watching', 'idle', 'waiting'):
+                    continue
+                rss = browser_rss_mb(driver)
+                if rss is None or rss < self.options.max_rss_mb:
+                    continue
+
+                current_time = time.strftime("%H:%M:%S")
+                print(f"[{current_time}] [{watch.account}] Browser uses {rss:.0f} MB. Starting a replacement...")
+                try:
+                    cookies = driver.get_cookies()
+                    watch.recycle(self.new_browser(watch.username, watch.password, cookies))
+                except Exception as e:
+                    print(f"[{watch.account}] Could not start a replacement browser: {str(e)}")
+
+    def shutdown(self):
+        """Close every watch and browser"""
+        with self.lock:
+            watches = list(self.watches.values())
+            self.watches = {}
+        for watch in watches:
+            watch.close()
+        for watch in watches:
+            watch.thread.join(timeout=30)
+        for driver in self.open_browsers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+class ControlHandler(socketserver.StreamRequestHandler):
+    """One JSON request line in, one JSON reply line out"""
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            reply = self.server.checker_daemon.handle(request)
+        except (KeyError, TypeError, ValueError) as e:
+            reply = {'ok': False, 'error': str(e)}
+        self.wfile.write(json.dumps(reply).encode() + b'\n')
+
+class ControlServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def open_control_socket(path, checker_daemon):
+    """Listen on a Unix socket only this user can use, replacing a stale socket file"""
+    if os.path.exists(path):
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(path)
+            raise SystemExit(f"A daemon is already listening on {path}")
+        except ConnectionRefusedError:
+            os.unlink(path)
+
+    old_umask = os.umask(0o177)
+    try:
+        server = ControlServer(path, ControlHandler)
+    finally:
+        os.umask(old_umask)
+    server.checker_daemon = checker_daemon
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the Crystal Mountain checker as a long-lived daemon')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help='Control socket path (see checkerctl.py)')
+    parser.add_argument('--max-browsers', type=int, default=os.cpu_count() or 2,
+                        help='Maximum number of accounts (one browser each)')
+    parser.add_argument('--max-rss-mb', type=float, default=1500,
+                        help='Replace a browser once its processes use more than this much memory (default: 1500)')
+    parser.add_argument('--engine', choices=['browser', 'http'], default='browser')
+    parser.add_argument('--watch-mode', choices=['refresh', 'observer'], default='refresh')
+    parser.add_argument('--poll-interval', type=positive_seconds)
+    parser.add_argument('--scheduler', choices=['fixed', 'adaptive'], default='fixed')
+    parser.add_argument('--burst', action='append', metavar='HH:MM-HH:MM[@SECONDS]',
+                        help='Daily burst window for the adaptive scheduler (repeatable)')
+    parser.add_argument('--max-polls-per-minute', type=positive_number, help='Poll budget shared by every account')
+    parser.add_argument('--history', metavar='FILE', default=os.getenv('CRYSTAL_HISTORY_FILE'),
+                        help='Record every observed status in a SQLite file')
+    parser.add_argument('--burst-from-history', action='store_true',
+                        help='Add burst windows learned from --history (adaptive scheduler)')
+    parser.add_argument('--snapshots', metavar='DIR', default=os.getenv('CRYSTAL_SNAPSHOT_DIR'),
+                        help='Save gzip HTML snapshots on every status change and error')
+    parser.add_argument('--trace', metavar='FILE', default=os.getenv('CRYSTAL_TRACE_FILE'),
+                        help='Append per-phase timings as JSONL')
+    parser.add_argument('--reservation', choices=['click', 'ajax'], default='click')
+    parser.add_argument('--warm-checkout-tab', action='store_true')
+    parser.add_argument('--lean', action='store_true', help='Run the watching browsers in lean headless mode')
+    options = parser.parse_args()
+
+    if (options.burst or options.burst_from_history) and options.scheduler != 'adaptive':
+        parser.error('--burst and --burst-from-history need --scheduler adaptive')
+    if options.burst_from_history and not options.history:
+        parser.error('--burst-from-history needs --history')
+    try:
+        options.learned_windows = history.load_burst_windows(options.history) if options.burst_from_history else []
+        create_scheduler(options.scheduler, poll_interval(options), options.burst)
+    except ValueError as e:
+        parser.error(str(e))
+    if options.history:
+        history.configure(options.history)
+    if options.snapshots:
+        snapshots.configure(options.snapshots)
+    if options.trace:
+        tracing.configure(options.trace)
+
+    checker_daemon = CheckerDaemon(options)
+    server = open_control_socket(options.socket, checker_daemon)
+    threading.Thread(target=server.serve_forever, name='control', daemon=True).start()
+    threading.Thread(target=checker_daemon.watchdog, name='watchdog', daemon=True).start()
+    print(f"Daemon listening on {options.socket}. Add watches with: python checkerctl.py add ACCOUNT MM/DD")
+
+    try:
+        while not checker_daemon.stopped.wait(1):
+            pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print("\nStopping daemon...")
+        checker_daemon.stopped.set()
+        server.shutdown()
+        server.server_close()
+        try:
+            os.unlink(options.socket)
+        except OSError:
+            pass
+        checker_daemon.shutdown()
+
+if __name__ == "__main__":
+    main()
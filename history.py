@@ -0,0 +1,232 @@
+"""Availability history: every observed status, stored in SQLite
+
+Each observation is one row: the watched date, when it was seen, the status
+text and how long reading it took. Status texts are stored once in their own
+table, so a row is a handful of integers. Rows are queued by record() and
+written in batches by a background thread, so the monitoring loop never waits
+on disk. Recording is off until configure() is given a path.
+
+Print when watched dates flipped from sold out to available, by weekday and
+hour, plus the burst windows that --burst-from-history would use:
+
+    python history.py report history.db
+"""
+import argparse
+import atexit
+import datetime
+import queue
+import sqlite3
+import threading
+import time
+
+from parsing import is_sold_out
+from scheduler import WEEKDAYS, BurstWindow
+
+# Rows written per transaction, and the longest a row waits in the queue
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 1.0
+
+# Where an observation came from (stored as its index)
+SOURCES = ('browser', 'calendar', 'http', 'observer')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS statuses (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS observations (
+    observed_ms INTEGER NOT NULL,   -- epoch milliseconds
+    watched_day INTEGER NOT NULL,   -- date.toordinal() of the watched date
+    status_id INTEGER NOT NULL REFERENCES statuses (id),
+    sold_out INTEGER NOT NULL,
+    latency_ms REAL,
+    source INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS observations_by_day ON observations (watched_day, observed_ms);
+"""
+
+def connect(path):
+    """Open a history database, creating the tables if needed"""
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")  # Readers (reports) don't block the writer
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+class HistoryStore:
+    """Append-only observation log with a background writer"""
+
+    def __init__(self, path=None):
+        self.lock = threading.Lock()
+        self.queue = None
+        self.writer = None
+        self.configure(path)
+        atexit.register(self.close)
+
+    def configure(self, path):
+        """Start recording to path (None turns recording off)"""
+        self.close()
+        if not path:
+            return
+        # Fail here, not in the writer thread, if the file can't be opened
+        connect(path).close()
+        with self.lock:
+            self.queue = queue.Queue()
+            self.writer = threading.Thread(target=self._run, args=(path, self.queue), daemon=True)
+            self.writer.start()
+
+    @property
+    def enabled(self):
+        return self.queue is not None
+
+    def record(self, watched_date, status, latency_ms=None, source='browser'):
+        """Queue one observation of a watched date's status"""
+        if self.queue is None:
+            return
+        self.queue.put((int(time.time() * 1000), watched_date.toordinal(), status,
+                        is_sold_out(status), latency_ms, SOURCES.index(source)))
+
+    def close(self):
+        """Write out queued observations and stop the writer"""
+        with self.lock:
+            pending, writer = self.queue, self.writer
+            self.queue = self.writer = None
+        if pending is not None:
+            pending.put(None)
+            writer.join()
+
+    def _run(self, path, pending):
+        conn = connect(path)
+        status_ids = dict(conn.execute("SELECT text, id FROM statuses"))
+        done = False
+
+        while not done:
+            rows = []
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while len(rows) < BATCH_SIZE:
+                try:
+                    row = pending.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if row is None:
+                    done = True
+                    break
+                rows.append(row)
+            if not rows:
+                continue
+
+            try:
+                with conn:
+                    for i, (observed_ms, watched_day, status, sold_out, latency_ms, source) in enumerate(rows):
+                        if status not in status_ids:
+                            conn.execute("INSERT OR IGNORE INTO statuses (text) VALUES (?)", (status,))
+                            status_ids[status] = conn.execute(
+                                "SELECT id FROM statuses WHERE text = ?", (status,)).fetchone()[0]
+                        rows[i] = (observed_ms, watched_day, status_ids[status], sold_out, latency_ms, source)
+                    conn.executemany("INSERT INTO observations VALUES (?, ?, ?, ?, ?, ?)", rows)
+            except sqlite3.Error as e:
+                print(f"⚠️ Could not write {len(rows)} history rows: {str(e)}")
+                status_ids = dict(conn.execute("SELECT text, id FROM statuses"))
+
+        conn.close()
+
+# Shared store for the whole process
+history = HistoryStore()
+
+def configure(path):
+    """Point the shared history store at a SQLite file"""
+    history.configure(path)
+
+def find_flips(conn, since=None):
+    """Yield (watched date, datetime seen) each time a watched date went from sold out to available"""
+    since_ms = int(since.timestamp() * 1000) if since else 0
+    rows = conn.execute(
+        "SELECT watched_day, observed_ms, sold_out FROM observations "
+        "WHERE observed_ms >= ? ORDER BY watched_day, observed_ms", (since_ms,))
+
+    last_day, last_sold_out = None, None
+    for watched_day, observed_ms, sold_out in rows:
+        if watched_day == last_day and last_sold_out and not sold_out:
+            yield datetime.date.fromordinal(watched_day), datetime.datetime.fromtimestamp(observed_ms / 1000)
+        last_day, last_sold_out = watched_day, sold_out
+
+def flip_histogram(flips):
+    """Count flips by local weekday and hour: histogram[weekday][hour]"""
+    histogram = [[0] * 24 for _ in WEEKDAYS]
+    for _, seen in flips:
+        histogram[seen.weekday()][seen.hour] += 1
+    return histogram
+
+def burst_windows(histogram, interval=0.5, hours_per_day=2, min_flips=2, lead_minutes=5):
+    """Burst windows covering the busiest flip hours of each weekday
+
+    Each window starts lead_minutes before the hour and ends when the hour
+    does. Hours with fewer than min_flips flips are ignored.
+    """
+    windows = []
+    for weekday, hours in enumerate(histogram):
+        busiest = sorted((h for h in range(24) if hours[h] >= min_flips), key=lambda h: -hours[h])
+        for hour in sorted(busiest[:hours_per_day]):
+            start_minutes = max(0, hour * 60 - lead_minutes)
+            windows.append(BurstWindow(
+                datetime.time(start_minutes // 60, start_minutes % 60),
+                datetime.time((hour + 1) % 24, 0),
+                interval,
+                weekdays={weekday},
+            ))
+    return windows
+
+def load_burst_windows(path, interval=0.5, days=90):
+    """Burst windows learned from the last days of a history file"""
+    conn = connect(path)
+    try:
+        since = datetime.datetime.now() - datetime.timedelta(days=days)
+        return burst_windows(flip_histogram(find_flips(conn, since)), interval)
+    finally:
+        conn.close()
+
+def print_report(conn, since=None):
+    """Print observation counts, the weekday/hour flip histogram and suggested windows"""
+    count, first_ms, last_ms = conn.execute(
+        "SELECT COUNT(*), MIN(observed_ms), MAX(observed_ms) FROM observations").fetchone()
+    if not count:
+        print("No observations recorded yet.")
+        return
+    first = datetime.datetime.fromtimestamp(first_ms / 1000)
+    last = datetime.datetime.fromtimestamp(last_ms / 1000)
+    print(f"{count} observations from {first:%Y-%m-%d %H:%M} to {last:%Y-%m-%d %H:%M}")
+
+    flips = list(find_flips(conn, since))
+    print(f"{len(flips)} sold out -> available flips\n")
+    if not flips:
+        return
+
+    histogram = flip_histogram(flips)
+    print("     " + ''.join(f"{hour:>4}" for hour in range(24)))
+    for weekday, hours in enumerate(histogram):
+        print(f"{WEEKDAYS[weekday]:<5}" + ''.join(f"{count or '.':>4}" for count in hours))
+
+    windows = burst_windows(histogram)
+    if windows:
+        print("\nSuggested burst windows:")
+        for window in windows:
+            print(f"  {window}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Analyze recorded availability history')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    report = subparsers.add_parser('report', help='Print when spots opened, by weekday and hour')
+    report.add_argument('file', help='SQLite history file')
+    report.add_argument('--days', type=int, help='Only look at the last DAYS days')
+    args = parser.parse_args()
+
+    if args.command == 'report':
+        since = datetime.datetime.now() - datetime.timedelta(days=args.days) if args.days else None
+        conn = connect(args.file)
+        try:
+            print_report(conn, since)
+        finally:
+            conn.close()
+
+if __name__ == "__main__":
+    main()
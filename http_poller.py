@@ -0,0 +1,183 @@
+from http.cookies import SimpleCookie
+import time
+import urllib3
+from parsing import calendar_id_for, classify_day_cell, html_to_text, is_sold_out, match_day_cell, parse_calendars
+from tracing import tracer
+from history import history
+
+class SessionExpired(Exception):
+    """Raised when the site sends the HTTP poller back to the login page"""
+
+class CalendarMissing(Exception):
+    """Raised when the calendar page has no calendar block for a watched month"""
+
+def cookies_from_driver(driver):
+    """Copy the session cookies out of a logged-in Selenium driver"""
+    return {cookie['name']: cookie['value'] for cookie in driver.get_cookies()}
+
+def cell_markup(cell):
+    """The parts of a day cell that change when its state does"""
+    return tuple(cell.get(key, '') for key in ('text', 'className', 'title', 'dataDate'))
+
+class HttpPoller:
+    """Poll the calendar (and optionally the availability endpoint) without a browser
+
+    Reuses the cookies of a logged-in Selenium session over a pooled keep-alive
+    connection. The availability path is a template such as
+    '/availability/?date={date}' where {date} is filled with YYYY-MM-DD; without
+    one, only the calendar page is polled and dates are reported from their day
+    cell markup.
+
+    A cell the markup doesn't classify is reported as a candidate for the
+    browser to confirm. Once the browser has found it sold out, it is only
+    reported again after unknown_recheck seconds or when its markup changes.
+    """
+
+    def __init__(self, base_url, cookies, user_agent=None, calendar_path='/',
+                 availability_path=None, timeout=10, unknown_recheck=5):
+        self.base_url = base_url.rstrip('/')
+        self.calendar_path = calendar_path
+        self.availability_path = availability_path
+        self.cookies = dict(cookies)
+        self.unknown_recheck = unknown_recheck
+        self.last_html = ''  # calendar page of the last poll, for snapshots
+        self.last_cells = {}
+        self.last_statuses = {}
+        self.browser_checked = {}  # date: (cell markup, time) of the last browser check that found it sold out
+
+        headers = {'Accept': 'text/html,application/xhtml+xml,*/*'}
+        if user_agent:
+            headers['User-Agent'] = user_agent
+
+        # One host, a handful of keep-alive connections
+        self.http = urllib3.PoolManager(
+            num_pools=2,
+            maxsize=4,
+            headers=headers,
+            retries=False,
+            timeout=urllib3.Timeout(total=timeout),
+        )
+
+    @classmethod
+    def from_driver(cls, driver, base_url, **kwargs):
+        """Create a poller that shares the session of a logged-in driver"""
+        user_agent = driver.execute_script("return navigator.userAgent;")
+        return cls(base_url, cookies_from_driver(driver), user_agent=user_agent, **kwargs)
+
+    def update_cookies(self, cookies):
+        """Replace the session cookies (e.g. after logging in again)"""
+        self.cookies = dict(cookies)
+
+    def get(self, path):
+        """GET a path on the site and return the decoded body"""
+        return self.request('GET', path)
+
+    def post(self, path, body, headers=None):
+        """POST a raw body to a path on the site and return the decoded response"""
+        return self.request('POST', path, body, headers)
+
+    def request(self, method, path, body=None, headers=None):
+        """Send a request with the session cookies; raises SessionExpired or HTTPError on failure
+
+        Redirects are not followed: one to the login page raises SessionExpired,
+        any other raises HTTPError.
+        """
+        headers = dict(headers or {})
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{name}={value}' for name, value in self.cookies.items())
+
+        response = self.http.request(method, f'{self.base_url}{path}', body=body, headers=headers, redirect=False)
+
+        # Keep the cookie jar in sync with whatever the server rotates
+        for header in response.headers.getlist('Set-Cookie'):
+            cookie = SimpleCookie()
+            cookie.load(header)
+            for name, morsel in cookie.items():
+                self.cookies[name] = morsel.value
+
+        location = response.headers.get('Location', '')
+        if response.status in (401, 403) or (300 <= response.status < 400 and '/login' in location):
+            raise SessionExpired(f"Session expired (HTTP {response.status})")
+        if 300 <= response.status < 400:
+            # Its body is empty; don't let it pass for a page
+            raise urllib3.exceptions.HTTPError(f"HTTP {response.status} to {location or '?'} for {path}")
+        if response.status >= 400:
+            raise urllib3.exceptions.HTTPError(f"HTTP {response.status} for {path}")
+
+        return response.data.decode('utf-8', errors='replace')
+
+    def confirmed_sold_out(self, target_date):
+        """Note that the browser found a date this poller reported as a candidate sold out"""
+        cell = self.last_cells.get(target_date)
+        if cell:
+            self.browser_checked[target_date] = (cell_markup(cell), time.monotonic())
+
+    def recently_confirmed(self, target_date, cell):
+        """Check whether the browser found this unchanged cell sold out within unknown_recheck seconds"""
+        checked = self.browser_checked.get(target_date)
+        return (
+            checked is not None
+            and checked[0] == cell_markup(cell)
+            and time.monotonic() - checked[1] < self.unknown_recheck
+        )
+
+    def fetch_status(self, target_date):
+        """Fetch the parking status text for a date from the availability endpoint"""
+        return html_to_text(self.get(self.availability_path.format(date=target_date.isoformat()))).upper()
+
+    def find_open_date(self, target_dates):
+        """Poll once and return (date, status text) for the first open date, or (None, None)"""
+        with tracer.span('http_poll', dates=len(target_dates)) as span:
+            open_date, open_status = self._poll(target_dates)
+            span.end('open' if open_date else 'sold_out')
+            return open_date, open_status
+
+    def _poll(self, target_dates):
+        started = time.perf_counter()
+        self.last_html, self.last_statuses = '', {}
+        self.last_html = self.get(self.calendar_path)
+        calendars = parse_calendars(self.last_html)
+
+        # A JS-rendered calendar or a maintenance page would otherwise read as sold out forever
+        missing = sorted({calendar_id_for(target_date) for target_date in target_dates} - set(calendars))
+        if missing:
+            raise CalendarMissing(f"No {', '.join(missing)} on {self.calendar_path}")
+
+        cells = self.last_cells = {
+            target_date: match_day_cell(calendars[calendar_id_for(target_date)], target_date)
+            for target_date in target_dates
+        }
+        current_time = time.strftime("%H:%M:%S")
+        open_date, open_status = None, None
+
+        for target_date in target_dates:
+            cell = cells.get(target_date)
+            if not cell:
+                continue
+
+            state = classify_day_cell(cell)
+            if state == 'sold_out':
+                self.last_statuses[target_date] = "SOLD OUT (CALENDAR)"
+                history.record(target_date, "SOLD OUT (CALENDAR)", (time.perf_counter() - started) * 1000, 'http')
+                continue
+
+            if self.availability_path:
+                fetch_started = time.perf_counter()
+                status = self.last_statuses[target_date] = self.fetch_status(target_date)
+                history.record(target_date, status, (time.perf_counter() - fetch_started) * 1000, 'http')
+                if is_sold_out(status):
+                    continue
+            elif state == 'unknown':
+                # The calendar markup doesn't say; let the browser confirm it now and then
+                status = self.last_statuses[target_date] = "UNKNOWN (CALENDAR)"
+                if self.recently_confirmed(target_date, cell):
+                    continue
+            else:
+                status = self.last_statuses[target_date] = "AVAILABLE (CALENDAR)"
+
+            open_date, open_status = target_date, status
+            break
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"[{current_time}] HTTP poll: {'open ' + str(open_date) if open_date else 'sold out'} ({elapsed_ms:.0f} ms)")
+        return open_date, open_status
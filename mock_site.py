@@ -0,0 +1,407 @@
+"""Local stand-in for parking.crystalmountainresort.com
+
+Reproduces the parts of the site the checker depends on: the login page XPaths,
+the calendar_YYYY-MM day cells, the status div at /html/body/div[2]/div[5]/div/div[1],
+#spot-select rows with .add2cart[data-type="car"], the AJAX add-to-cart that
+redirects to /cart/, the cart select at /html/body/div[1]/div[1]/select and
+#btnCheckout.
+
+Behavior is scripted with a scenario (JSON file or defaults):
+
+    {
+        "open_windows": [[30, 90]],   # seconds after start/reset when spots are available
+        "open_dates": null,           # ISO dates that open (null: every date)
+        "ajax_delay": 0.0,            # seconds added to /availability/ and /cart/add/
+        "churn_interval": 0.0,        # re-render the calendars every N seconds (stale elements)
+        "mark_cells": false,          # put soldout/available classes on day cells
+        "live_status_interval": 0.0,  # page re-fetches the selected date's status every N seconds
+        "session_ttl": 0,             # seconds before a login expires (0: never)
+        "empty_cart_page": false      # serve an empty /cart/ instead of redirecting to /
+    }
+
+An empty cart redirects to the calendar by default. empty_cart_page serves a
+cart page instead, for trying the warm checkout tab on a site that does; the
+live site's behaviour may differ.
+
+Run it standalone and point the checker at it:
+
+    python mock_site.py --port 8000 --scenario scenario.json
+    CRYSTAL_BASE_URL=http://127.0.0.1:8000 python crystal_mountain_checker.py --date MM/DD
+
+GET /__events returns what happened (opened, availability served, cart add,
+checkout) with wall-clock timestamps; POST /__reset restarts the scenario clock.
+"""
+import argparse
+import calendar
+import datetime
+import html
+import json
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_SCENARIO = {
+    'open_windows': [[30, 90]],
+    'open_dates': None,
+    'ajax_delay': 0.0,
+    'churn_interval': 0.0,
+    'mark_cells': False,
+    'live_status_interval': 0.0,
+    'session_ttl': 0,
+    'empty_cart_page': False,
+}
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><title>Log in</title></head>
+<body>
+<div>
+  <div>
+    <div>
+      <div>
+        <button type="button" onclick="document.getElementById('login-form').style.display = 'block'">Log in with email</button>
+        <button type="button">Create account</button>
+      </div>
+      <div id="login-form" style="display: none">
+        <form method="post" action="/login/">
+          <div>Sign in</div>
+          <div><div><input type="text" name="username" placeholder="Email"><input type="password" name="password" placeholder="Password"></div></div>
+        </form>
+      </div>
+    </div>
+  </div>
+</div>
+</body></html>
+"""
+
+MAIN_PAGE = """<!DOCTYPE html>
+<html><head><title>Parking</title>
+<style>
+  [id^="calendar_"] {{ display: grid; grid-template-columns: repeat(7, 3em); gap: 2px; margin-bottom: 1em; }}
+  [id^="calendar_"] > div {{ padding: 4px; border: 1px solid #ccc; cursor: pointer; }}
+  .spot-row {{ padding: 6px; border: 1px solid #888; margin: 4px 0; cursor: pointer; }}
+</style>
+</head>
+<body>
+<div class="header"><a href="/logout/">Log out</a></div>
+<div class="main">
+  <div><h1>Reserve parking</h1></div>
+  <div class="calendars">{calendars}</div>
+  <div></div>
+  <div></div>
+  <div class="details"><div><div id="status">Select a date</div><div id="spot-select"></div></div></div>
+</div>
+<script>
+const LIVE_STATUS_INTERVAL = {live_status_interval};
+const CHURN_INTERVAL = {churn_interval};
+let selectedDate = null;
+
+function loadStatus(date) {{
+  return fetch('/availability/?date=' + date, {{credentials: 'same-origin'}})
+    .then(response => response.text())
+    .then(body => {{
+      if (date !== selectedDate) return;
+      const fragment = document.createElement('template');
+      fragment.innerHTML = body;
+      document.getElementById('status').textContent = fragment.content.querySelector('[data-role="status"]').textContent;
+      document.getElementById('spot-select').innerHTML = fragment.content.querySelector('[data-role="spots"]').innerHTML;
+    }});
+}}
+
+document.addEventListener('click', event => {{
+  const day = event.target.closest('[id^="calendar_"] > div');
+  if (day && day.dataset.date) {{
+    selectedDate = day.dataset.date.split('T')[0];
+    document.querySelectorAll('[id^="calendar_"] > div.selected').forEach(cell => cell.classList.remove('selected'));
+    day.classList.add('selected');
+    document.getElementById('status').textContent = 'Loading...';
+    document.getElementById('spot-select').innerHTML = '';
+    loadStatus(selectedDate);
+    return;
+  }}
+  const reserve = event.target.closest('.add2cart');
+  if (reserve) {{
+    fetch('/cart/add/', {{
+      method: 'POST',
+      credentials: 'same-origin',
+      headers: {{'Content-Type': 'application/x-www-form-urlencoded'}},
+      body: 'date=' + encodeURIComponent(selectedDate) + '&type=' + encodeURIComponent(reserve.dataset.type)
+    }})
+      .then(response => response.json())
+      .then(result => {{ if (result.ok) window.location = result.redirect; else window.location.reload(); }});
+  }}
+}});
+
+if (LIVE_STATUS_INTERVAL > 0) {{
+  setInterval(() => {{ if (selectedDate) loadStatus(selectedDate); }}, LIVE_STATUS_INTERVAL * 1000);
+}}
+
+if (CHURN_INTERVAL > 0) {{
+  // Re-render every calendar so element references held by the checker go stale
+  setInterval(() => {{
+    document.querySelectorAll('[id^="calendar_"]').forEach(calendar => {{
+      const copy = calendar.cloneNode(true);
+      calendar.replaceWith(copy);
+    }});
+  }}, CHURN_INTERVAL * 1000);
+}}
+</script>
+</body></html>
+"""
+
+CART_PAGE = """<!DOCTYPE html>
+<html><head><title>Cart</title></head>
+<body>
+<div>
+  <div><select name="vehicle"><option value="">Choose a vehicle</option><option value="1">Subaru</option><option value="2">Tacoma</option></select></div>
+  <div>Car Parking - {date}</div>
+  <div><button id="btnCheckout" type="button" onclick="window.location = '/checkout/'">Checkout</button></div>
+</div>
+</body></html>
+"""
+
+EMPTY_CART_PAGE = """<!DOCTYPE html>
+<html><head><title>Cart</title></head>
+<body><div><div><p>Your cart is empty.</p></div></div></body></html>
+"""
+
+CHECKOUT_PAGE = """<!DOCTYPE html>
+<html><head><title>Checkout</title></head>
+<body><div><div><h1>Checkout</h1><p>Payment would happen here.</p></div></div></body></html>
+"""
+
+class MockSite:
+    """Scriptable mock parking site running on a background thread"""
+
+    def __init__(self, scenario=None, host='127.0.0.1', port=0):
+        self.scenario = dict(DEFAULT_SCENARIO, **(scenario or {}))
+        self.lock = threading.Lock()
+        self.sessions = {}
+        self.carts = {}
+        self.reset()
+
+        site = self
+
+        class Handler(MockSiteHandler):
+            pass
+        Handler.site = site
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """Serve on a daemon thread; returns self"""
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset(self, scenario=None):
+        """Restart the scenario clock (optionally with new settings) and clear the event log"""
+        with self.lock:
+            if scenario:
+                self.scenario.update(scenario)
+            self.started = time.time()
+            self.events = []
+            self.carts = {}
+            for start, _ in self.scenario['open_windows']:
+                self.events.append({'event': 'opened', 'time': self.started + start})
+
+    def record(self, event, **fields):
+        with self.lock:
+            self.events.append(dict(event=event, time=time.time(), **fields))
+
+    def first_event(self, event, after=0):
+        """Time of the first recorded event of a kind at or after a time, or None"""
+        with self.lock:
+            times = [e['time'] for e in self.events if e['event'] == event and e['time'] >= after]
+        return min(times) if times else None
+
+    def is_open(self, date_iso, now=None):
+        """Whether spots are available for a date at a given time"""
+        open_dates = self.scenario['open_dates']
+        if open_dates is not None and date_iso not in open_dates:
+            return False
+        elapsed = (now or time.time()) - self.started
+        return any(start <= elapsed < end for start, end in self.scenario['open_windows'])
+
+    def visible_months(self):
+        """The current month and the next one, as (year, month) pairs"""
+        today = datetime.date.today()
+        next_month = (today.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+        return [(today.year, today.month), (next_month.year, next_month.month)]
+
+    def render_calendars(self):
+        blocks = []
+        for year, month in self.visible_months():
+            first_weekday, days = calendar.monthrange(year, month)
+            cells = ['<div class="day blank"></div>'] * ((first_weekday + 1) % 7)
+            for day in range(1, days + 1):
+                date_iso = f'{year}-{month:02d}-{day:02d}'
+                classes = 'day'
+                if self.scenario['mark_cells']:
+                    classes += ' available' if self.is_open(date_iso) else ' soldout'
+                cells.append(f'<div class="{classes}" data-date="{date_iso}T08:00:00.000Z">{day}</div>')
+            blocks.append(f'<div id="calendar_{year}-{month:02d}">{"".join(cells)}</div>')
+        return ''.join(blocks)
+
+    def render_availability(self, date_iso):
+        if self.is_open(date_iso):
+            status = 'Car Parking: 12 spots available'
+            spots = ('<div class="spot-row add2cart" data-type="car">Reserve Car Parking</div>'
+                     '<div class="spot-row add2cart" data-type="carpool">Reserve Carpool Parking</div>')
+        else:
+            status = 'Car Parking: SOLD OUT'
+            spots = ''
+        return f'<div data-role="status">{status}</div><div data-role="spots">{spots}</div>'
+
+class MockSiteHandler(BaseHTTPRequestHandler):
+    """Routes requests for MockSite"""
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real site
+    site = None
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output readable
+
+    def send_body(self, status, body, content_type='text/html; charset=utf-8', headers=None):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def redirect(self, location, headers=None):
+        self.send_body(302, '', headers=dict(headers or {}, Location=location))
+
+    def session(self):
+        """Return the session id from the cookie if it is still valid"""
+        cookies = dict(
+            part.strip().split('=', 1) for part in self.headers.get('Cookie', '').split(';') if '=' in part
+        )
+        session_id = cookies.get('sessionid')
+        with self.site.lock:
+            created = self.site.sessions.get(session_id)
+        ttl = self.site.scenario['session_ttl']
+        if created is None or (ttl and time.time() - created > ttl):
+            return None
+        return session_id
+
+    def read_form(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return {key: values[0] for key, values in parse_qs(self.rfile.read(length).decode('utf-8')).items()}
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        site = self.site
+
+        if url.path == '/__events':
+            with site.lock:
+                body = json.dumps({'started': site.started, 'events': site.events})
+            return self.send_body(200, body, 'application/json')
+        if url.path == '/login/':
+            return self.send_body(200, LOGIN_PAGE)
+        if url.path == '/logout/':
+            return self.redirect('/login/', {'Set-Cookie': 'sessionid=; Path=/; Max-Age=0'})
+
+        session_id = self.session()
+        if session_id is None:
+            return self.redirect('/login/')
+
+        if url.path == '/':
+            return self.send_body(200, MAIN_PAGE.format(
+                calendars=site.render_calendars(),
+                live_status_interval=site.scenario['live_status_interval'],
+                churn_interval=site.scenario['churn_interval'],
+            ))
+        if url.path == '/availability/':
+            time.sleep(site.scenario['ajax_delay'])
+            date_iso = query.get('date', '')
+            if site.is_open(date_iso):
+                site.record('availability_open', date=date_iso)
+            return self.send_body(200, site.render_availability(date_iso))
+        if url.path == '/cart/':
+            with site.lock:
+                cart = site.carts.get(session_id)
+            if not cart:
+                if site.scenario['empty_cart_page']:
+                    return self.send_body(200, EMPTY_CART_PAGE)
+                return self.redirect('/')
+            return self.send_body(200, CART_PAGE.format(date=html.escape(cart['date'])))
+        if url.path == '/checkout/':
+            site.record('checkout')
+            return self.send_body(200, CHECKOUT_PAGE)
+
+        self.send_body(404, 'Not found')
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        site = self.site
+
+        if url.path == '/__reset':
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length).decode('utf-8') if length else ''
+            site.reset(json.loads(body) if body else None)
+            return self.send_body(200, '{"ok": true}', 'application/json')
+        if url.path == '/login/':
+            form = self.read_form()
+            if not form.get('username') or not form.get('password'):
+                return self.redirect('/login/')
+            session_id = secrets.token_hex(16)
+            with site.lock:
+                site.sessions[session_id] = time.time()
+            return self.redirect('/', {'Set-Cookie': f'sessionid={session_id}; Path=/; HttpOnly'})
+
+        session_id = self.session()
+        if session_id is None:
+            return self.send_body(401, '{"ok": false}', 'application/json')
+
+        if url.path == '/cart/add/':
+            time.sleep(site.scenario['ajax_delay'])
+            form = self.read_form()
+            if not site.is_open(form.get('date', '')):
+                return self.send_body(200, '{"ok": false}', 'application/json')
+            with site.lock:
+                site.carts[session_id] = {'date': form['date'], 'type': form.get('type')}
+            site.record('cart_add', date=form['date'])
+            return self.send_body(200, '{"ok": true, "redirect": "/cart/"}', 'application/json')
+
+        self.send_body(404, 'Not found')
+
+def load_scenario(path):
+    """Read a scenario JSON file"""
+    with open(path) as f:
+        return json.load(f)
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the local mock parking site')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--scenario', help='Scenario JSON file (see module docstring)')
+    args = parser.parse_args()
+
+    site = MockSite(load_scenario(args.scenario) if args.scenario else None, args.host, args.port)
+    print(f"Mock parking site on {site.base_url} (Ctrl+C to stop)")
+    print(f"Scenario: {json.dumps(site.scenario)}")
+    try:
+        site.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        site.server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""Run many (account, date) checker jobs from one process with a bounded browser pool
+
+Job file format (JSON list):
+
+    [
+        {"account": "alice", "date": "03/14"},
+        {"account": "alice", "date": "03/15"},
+        {"account": "bob", "date": "03/14"}
+    ]
+
+Credentials for each account come from CRYSTAL_USERNAME_<ACCOUNT> and
+CRYSTAL_PASSWORD_<ACCOUNT> (account name upper-cased), or from "username" and
+"password" keys in the job. All dates of one account are watched by a single
+browser, so the number of Chrome processes is bounded by --max-browsers no
+matter how many dates are listed. A browser left open at checkout keeps its
+slot until the orchestrator exits.
+
+    python orchestrator.py jobs.json --max-browsers 4
+"""
+import argparse
+import json
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import crystal_mountain_checker as checker
+from scheduler import PollBudget, create_scheduler, positive_number, positive_seconds
+import history
+import snapshots
+
+# Seconds between checks while every date of a worker is being booked by another account
+TAKEN_RECHECK_INTERVAL = 5
+
+class DateClaims:
+    """Make sure only one worker books a given date"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.claimed = {}
+        self.booked = {}
+
+    def claim(self, date, account):
+        """Claim a date before checking out; False if another worker has it"""
+        with self.lock:
+            if date in self.claimed or date in self.booked:
+                return False
+            self.claimed[date] = account
+            return True
+
+    def release(self, date):
+        """Give a date back after a failed checkout"""
+        with self.lock:
+            self.claimed.pop(date, None)
+
+    def mark_booked(self, date, account):
+        """Record a successful checkout for a date"""
+        with self.lock:
+            self.claimed.pop(date, None)
+            self.booked[date] = account
+
+    def taken(self, date):
+        """Check whether a date is being booked or has been booked"""
+        with self.lock:
+            return date in self.claimed or date in self.booked
+
+    def is_booked(self, date):
+        """Check whether a date has been booked"""
+        with self.lock:
+            return date in self.booked
+
+class AccountClaims:
+    """DateClaims bound to one account, in the shape monitor_for_parking expects"""
+
+    def __init__(self, claims, account):
+        self.claims = claims
+        self.account = account
+
+    def claim(self, date):
+        return self.claims.claim(date, self.account)
+
+    def release(self, date):
+        self.claims.release(date)
+
+    def taken(self, date):
+        return self.claims.taken(date)
+
+class AlertChannel:
+    """One alert thread shared by every worker, so alerts never overlap"""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def notify(self, account, date):
+        """Queue an alert for a date that opened"""
+        self.queue.put((account, date))
+
+    def _run(self):
+        while True:
+            account, date = self.queue.get()
+            current_time = time.strftime("%H:%M:%S")
+            print(f"\n🔔 [{current_time}] {account}: parking open for {checker.format_date(date)}")
+            checker.play_alert()
+
+def credentials_for(account, username=None, password=None):
+    """Return (username, password) for an account, from CRYSTAL_USERNAME_<ACCOUNT> and CRYSTAL_PASSWORD_<ACCOUNT>"""
+    env_suffix = re.sub(r'\W', '_', account).upper()
+    username = username or os.getenv(f'CRYSTAL_USERNAME_{env_suffix}')
+    password = password or os.getenv(f'CRYSTAL_PASSWORD_{env_suffix}')
+    if not username or not password:
+        raise ValueError(f"Missing credentials for account '{account}'. "
+                         f"Set CRYSTAL_USERNAME_{env_suffix} and CRYSTAL_PASSWORD_{env_suffix}")
+    return username, password
+
+def load_jobs(path):
+    """Read the job file and group it into {account: {'username', 'password', 'dates'}}"""
+    with open(path) as f:
+        jobs = json.load(f)
+
+    accounts = {}
+    for job in jobs:
+        account = job['account']
+        if account not in accounts:
+            username, password = credentials_for(account, job.get('username'), job.get('password'))
+            accounts[account] = {'username': username, 'password': password, 'dates': set()}
+        entry = accounts[account]
+
+        target_date = checker.parse_date(job['date'])
+        if checker.date_invalid(target_date):
+            print(f"Skipping {account} {checker.format_date(target_date)}: date is outside the booking window")
+            continue
+        entry['dates'].add(target_date)
+
+    return {account: entry for account, entry in accounts.items() if entry['dates']}
+
+def acquire_browser_slot(browser_slots, account, stop_event):
+    """Wait for a free browser slot; False if stopped first"""
+    if browser_slots.acquire(blocking=False):
+        return True
+    print(f"[{account}] Waiting for a browser slot (browsers left open at checkout keep theirs)")
+    while not stop_event.is_set():
+        if browser_slots.acquire(timeout=0.5):
+            return True
+    return False
+
+def wait_while_taken(account, target_dates, claims, stop_event):
+    """Wait while every date is being booked elsewhere; False once all are booked or when stopped
+
+    Drops booked dates from target_dates. A checkout in progress elsewhere
+    gives its date back if it fails, so claimed dates are watched again then.
+    """
+    while not stop_event.is_set():
+        target_dates[:] = [d for d in target_dates if not claims.is_booked(d)]
+        if not target_dates:
+            print(f"[{account}] Every date has been booked elsewhere.")
+            return False
+        if not all(claims.taken(d) for d in target_dates):
+            print(f"[{account}] A date was given back. Watching again...")
+            return True
+        stop_event.wait(TAKEN_RECHECK_INTERVAL)
+    return False
+
+def run_account(account, job, claims, alerts, stop_event, open_browsers, options, budget=None, browser_slots=None):
+    """Worker: log one account in and watch all of its dates until one is booked
+
+    browser_slots (a semaphore) caps the running browsers, counting the ones
+    left open at checkout: their slot is only given back when they close.
+    """
+    if stop_event.is_set():
+        return
+
+    # Dates only claimed elsewhere come back if that checkout fails, so keep them
+    target_dates = sorted(d for d in job['dates'] if not claims.is_booked(d))
+    if not target_dates:
+        print(f"[{account}] Every date is already booked. Skipping.")
+        return
+
+    if browser_slots and not acquire_browser_slot(browser_slots, account, stop_event):
+        return
+
+    profile_dir = os.path.join(options.profile_root, account) if options.profile_root else None
+    cookie_path = os.path.join(profile_dir, 'session_cookies.json') if profile_dir else None
+    record_network = options.reservation == 'ajax' and not checker.ajax_recipes.complete
+    try:
+        driver = checker.create_driver(profile_dir, options.lean, record_network)
+    except Exception:
+        if browser_slots:
+            browser_slots.release()
+        raise
+    keep_open = False
+
+    try:
+        print(f"[{account}] Watching {', '.join(checker.format_date(d) for d in target_dates)}")
+        checker.start_session(driver, job['username'], job['password'], cookie_path)
+
+        scheduler = create_scheduler(options.scheduler, poll_interval(options), options.burst, budget=budget,
+                                     burst_windows=options.learned_windows)
+        while True:
+            open_date, success = checker.monitor_for_parking(
+                driver, target_dates, job['username'], job['password'],
+                engine=options.engine,
+                poll_interval=options.poll_interval,
+                watch_mode=options.watch_mode,
+                claims=AccountClaims(claims, account),
+                alert=lambda date: alerts.notify(account, date),
+                stop_event=stop_event,
+                scheduler=scheduler,
+                warm_checkout_tab=options.warm_checkout_tab,
+                reservation=options.reservation,
+            )
+            if open_date is not None:
+                break
+            if not wait_while_taken(account, target_dates, claims, stop_event):
+                return
+
+        if success:
+            claims.mark_booked(open_date, account)
+            print(f"\n✅ [{account}] Checkout reached for {checker.format_date(open_date)}. Finish payment in its browser.")
+        else:
+            print(f"\n⚠️ [{account}] Could not complete the reservation for {checker.format_date(open_date)} automatically.")
+
+        # Leave the browser for a person to finish payment
+        if options.lean:
+            driver = checker.handoff_to_visible_browser(driver, profile_dir)
+        keep_open = True
+        open_browsers.append(driver)
+    except Exception as e:
+        print(f"[{account}] Worker failed: {str(e)}")
+    finally:
+        if not keep_open:
+            try:
+                driver.quit()
+            finally:
+                if browser_slots:
+                    browser_slots.release()
+
+def poll_interval(options):
+    """The base poll interval for the chosen engine"""
+    if options.poll_interval:
+        return options.poll_interval
+    return checker.HTTP_POLL_INTERVAL if options.engine == 'http' else checker.BROWSER_POLL_INTERVAL
+
+def main():
+    parser = argparse.ArgumentParser(description='Run several Crystal Mountain parking checkers from one process')
+    parser.add_argument('jobs', help='JSON job file of {"account", "date"} entries')
+    parser.add_argument('--max-browsers', type=int, default=os.cpu_count() or 2,
+                        help='Maximum number of Chrome instances watching at the same time (default: CPU count)')
+    parser.add_argument('--engine', choices=['browser', 'http'], default='browser')
+    parser.add_argument('--watch-mode', choices=['refresh', 'observer'], default='refresh')
+    parser.add_argument('--poll-interval', type=positive_seconds)
+    parser.add_argument('--scheduler', choices=['fixed', 'adaptive'], default='fixed')
+    parser.add_argument('--burst', action='append', metavar='HH:MM-HH:MM[@SECONDS]',
+                        help='Daily burst window for the adaptive scheduler (repeatable)')
+    parser.add_argument('--max-polls-per-minute', type=positive_number,
+                        help='Poll budget shared by every worker')
+    parser.add_argument('--history', metavar='FILE', default=os.getenv('CRYSTAL_HISTORY_FILE'),
+                        help='Record every observed status in a SQLite file')
+    parser.add_argument('--burst-from-history', action='store_true',
+                        help='Add burst windows learned from --history (adaptive scheduler)')
+    parser.add_argument('--snapshots', metavar='DIR', default=os.getenv('CRYSTAL_SNAPSHOT_DIR'),
+                        help='Save gzip HTML snapshots on every status change and error')
+    parser.add_argument('--lean', action='store_true', help='Run the watching browsers in lean headless mode')
+    parser.add_argument('--reservation', choices=['click', 'ajax'], default='click',
+                        help='Replay the learned AJAX requests (ajax) instead of clicking through the page')
+    parser.add_argument('--warm-checkout-tab', action='store_true',
+                        help='Give each browser a second tab kept on the cart page for checkout')
+    parser.add_argument('--profile-root', help='Directory holding one persistent Chrome profile per account')
+    options = parser.parse_args()
+
+    accounts = load_jobs(options.jobs)
+    if not accounts:
+        print("No jobs to run.")
+        return
+
+    max_browsers = max(1, min(options.max_browsers, len(accounts)))
+    if len(accounts) > max_browsers:
+        print(f"⚠️ {len(accounts)} accounts but only {max_browsers} browsers: "
+              f"the rest start when a worker finishes")
+
+    if (options.burst or options.burst_from_history) and options.scheduler != 'adaptive':
+        parser.error('--burst and --burst-from-history need --scheduler adaptive')
+    if options.burst_from_history and not options.history:
+        parser.error('--burst-from-history needs --history')
+
+    # Validate burst windows before any browser starts
+    try:
+        options.learned_windows = history.load_burst_windows(options.history) if options.burst_from_history else []
+        create_scheduler(options.scheduler, poll_interval(options), options.burst)
+    except ValueError as e:
+        parser.error(str(e))
+    if options.history:
+        history.configure(options.history)
+    if options.snapshots:
+        snapshots.configure(options.snapshots)
+
+    budget = PollBudget(options.max_polls_per_minute) if options.max_polls_per_minute else None
+    claims = DateClaims()
+    alerts = AlertChannel()
+    stop_event = threading.Event()
+    open_browsers = []
+    browser_slots = threading.BoundedSemaphore(max_browsers)
+
+    executor = ThreadPoolExecutor(max_workers=max_browsers, thread_name_prefix='checker')
+    futures = [
+        executor.submit(run_account, account, job, claims, alerts, stop_event, open_browsers, options, budget,
+                        browser_slots)
+        for account, job in accounts.items()
+    ]
+
+    try:
+        for future in futures:
+            # Poll so Ctrl+C is handled while workers are running
+            while not future.done():
+                time.sleep(0.5)
+
+        print("\nAll workers finished. Browsers with reservations remain open. Press Ctrl+C to exit.")
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\nStopping workers...")
+        stop_event.set()
+        for future in futures:
+            future.cancel()  # Jobs still waiting for a browser
+        executor.shutdown(wait=True)
+    finally:
+        for driver in open_browsers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+if __name__ == "__main__":
+    main()
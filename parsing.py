@@ -0,0 +1,206 @@
+import datetime
+from html.parser import HTMLParser
+
+# Class names the calendar may use to mark a day cell's state
+SOLD_OUT_CLASSES = {'sold', 'soldout', 'sold-out', 'unavailable', 'disabled', 'full'}
+AVAILABLE_CLASSES = {'available', 'open'}
+
+# Tags whose contents never show up as page text
+HIDDEN_TAGS = {'script', 'style', 'noscript', 'template'}
+
+def calendar_id_for(date):
+    """Return the id of the calendar block holding the given date: calendar_YYYY-MM"""
+    return f'calendar_{date.year}-{date.month:02d}'
+
+def is_sold_out(status_text):
+    """Check whether the parking status text says the date is sold out"""
+    return "SOLD OUT" in status_text.upper()
+
+def classify_day_cell(cell):
+    """Classify a day cell as 'sold_out', 'available' or 'unknown' from its markup"""
+    classes = set(cell.get('className', '').lower().split())
+    text = f"{cell.get('text', '')} {cell.get('title', '')}".upper()
+
+    if "SOLD OUT" in text or classes & SOLD_OUT_CLASSES:
+        return 'sold_out'
+    if classes & AVAILABLE_CLASSES:
+        return 'available'
+    return 'unknown'
+
+def data_date_day(value):
+    """Return the calendar date a data-date attribute stands for, or None
+
+    Timestamps such as 2026-03-08T08:00:00.000Z are midnight of the day in the
+    site's time zone written in UTC, so the UTC date part can be a day off for
+    zones east of UTC. Any zone within 12 hours of UTC puts local midnight
+    closest to the right UTC midnight, so the timestamp is rounded to the
+    nearest one. Dates and times without a zone are taken as written.
+    """
+    value = (value or '').strip()
+    try:
+        if len(value) <= 10:
+            return datetime.date.fromisoformat(value)
+        stamp = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if stamp.tzinfo is None:
+        return stamp.date()
+    return (stamp.astimezone(datetime.timezone.utc) + datetime.timedelta(hours=12)).date()
+
+def match_day_cell(cells, target_date):
+    """Pick the cell for a date out of its month's calendar day cells"""
+    # First try to find by exact text match (most reliable), skipping cells
+    # whose data-date puts them in a neighbouring month's overflow days
+    for cell in cells:
+        text = cell.get('text', '').strip()
+        if text.isdigit() and int(text) == target_date.day:
+            cell_date = data_date_day(cell.get('dataDate'))
+            if cell_date is None or cell_date == target_date:
+                return cell
+
+    # If not found by text, try matching by data-date attribute
+    # Format: 2026-03-08T08:00:00.000Z
+    for cell in cells:
+        if data_date_day(cell.get('dataDate')) == target_date:
+            return cell
+
+    return None
+
+class CalendarParser(HTMLParser):
+    """Collect the day cells (direct child divs) of every calendar_YYYY-MM block"""
+
+    def __init__(self):
+        super().__init__()
+        self.calendars = {}
+        self._divs = []  # One entry per open div: ('calendar', id), ('cell', cell) or None
+        self._cell = None
+        self._hidden = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in HIDDEN_TAGS:
+            self._hidden += 1
+            return
+        if tag != 'div':
+            return
+
+        attrs = dict(attrs)
+        parent = self._divs[-1] if self._divs else None
+
+        if self._cell is not None:
+            self._divs.append(None)
+        elif parent and parent[0] == 'calendar':
+            self._cell = {
+                'text': '',
+                'className': attrs.get('class') or '',
+                'title': attrs.get('title') or '',
+                'dataDate': attrs.get('data-date') or '',
+            }
+            self.calendars[parent[1]].append(self._cell)
+            self._divs.append(('cell', self._cell))
+        elif (attrs.get('id') or '').startswith('calendar_'):
+            self.calendars.setdefault(attrs['id'], [])
+            self._divs.append(('calendar', attrs['id']))
+        else:
+            self._divs.append(None)
+
+    def handle_endtag(self, tag):
+        if tag in HIDDEN_TAGS:
+            self._hidden = max(0, self._hidden - 1)
+            return
+        if tag != 'div' or not self._divs:
+            return
+
+        entry = self._divs.pop()
+        if entry and entry[0] == 'cell':
+            self._cell['text'] = ' '.join(self._cell['text'].split())
+            self._cell = None
+
+    def handle_data(self, data):
+        if self._cell is not None and not self._hidden:
+            self._cell['text'] += data
+
+def parse_calendars(html):
+    """Parse page HTML into {calendar_id: [day cell dicts]}"""
+    parser = CalendarParser()
+    parser.feed(html)
+    parser.close()
+    return parser.calendars
+
+def find_watched_days(html, target_dates):
+    """Find the day cell for every watched date in page HTML ({date: cell or None})"""
+    calendars = parse_calendars(html)
+    return {
+        target_date: match_day_cell(calendars.get(calendar_id_for(target_date), []), target_date)
+        for target_date in target_dates
+    }
+
+class TextParser(HTMLParser):
+    """Collect the visible text of an HTML fragment"""
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self._hidden = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in HIDDEN_TAGS:
+            self._hidden += 1
+
+    def handle_endtag(self, tag):
+        if tag in HIDDEN_TAGS:
+            self._hidden = max(0, self._hidden - 1)
+
+    def handle_data(self, data):
+        if not self._hidden:
+            self.parts.append(data)
+
+class SpotParser(HTMLParser):
+    """Collect the data-type of every add-to-cart spot row"""
+
+    def __init__(self):
+        super().__init__()
+        self.spot_types = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if 'add2cart' in (attrs.get('class') or '').split():
+            self.spot_types.append(attrs.get('data-type') or '')
+
+def find_spot_types(html):
+    """Return the data-type of each reservable spot row in an HTML fragment (e.g. ['car', 'carpool'])"""
+    parser = SpotParser()
+    parser.feed(html)
+    parser.close()
+    return parser.spot_types
+
+class CartParser(HTMLParser):
+    """Look for the checkout button, or a select inside a form (the cart's spot options)"""
+
+    def __init__(self):
+        super().__init__()
+        self.has_item = False
+        self._forms = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'form':
+            self._forms += 1
+        if dict(attrs).get('id') == 'btnCheckout' or (tag == 'select' and self._forms):
+            self.has_item = True
+
+    def handle_endtag(self, tag):
+        if tag == 'form':
+            self._forms = max(0, self._forms - 1)
+
+def cart_has_item(html):
+    """Check whether cart page HTML holds something to check out"""
+    parser = CartParser()
+    parser.feed(html)
+    parser.close()
+    return parser.has_item
+
+def html_to_text(html):
+    """Return the visible text of an HTML document or fragment"""
+    parser = TextParser()
+    parser.feed(html)
+    parser.close()
+    return ' '.join(' '.join(parser.parts).split())
@@ -0,0 +1,80 @@
+"""Escalating error recovery for the monitoring loop
+
+Rather than reloading the page after every exception, the loop hands the error
+to a Recovery, which runs the cheapest step not yet tried since the last good
+check: re-query the calendar, re-click without reloading, navigate back to the
+calendar, refresh, and finally restart the browser and log in again. A step
+that raises escalates straight to the next one. Each step is counted, timed
+and traced as a 'recovery' span.
+"""
+import time
+
+from tracing import tracer
+
+class RecoveryFailed(Exception):
+    """Raised when every recovery step has failed for an error"""
+
+class Recovery:
+    """Pick and run recovery steps, from cheapest to most drastic
+
+    steps is a list of (name, function) pairs. start_levels maps exception
+    classes to the step name they start at (e.g. a dead browser goes straight
+    to a restart).
+    """
+
+    def __init__(self, steps, start_levels=None):
+        self.steps = list(steps)
+        self.names = [name for name, _ in self.steps]
+        self.start_levels = start_levels or {}
+        self.level = 0
+        self.counts = {name: 0 for name in self.names}
+        self.failures = {name: 0 for name in self.names}
+        self.seconds = {name: 0.0 for name in self.names}
+
+    def start_level(self, error):
+        """The first step worth trying for an error"""
+        for error_type, name in self.start_levels.items():
+            if isinstance(error, error_type):
+                return self.names.index(name)
+        return 0
+
+    def recover(self, error):
+        """Run the next step for an error and return its name; raises RecoveryFailed"""
+        level = max(self.level, self.start_level(error))
+        while level < len(self.steps):
+            name, step = self.steps[level]
+            level += 1
+            self.counts[name] += 1
+            started = time.perf_counter()
+            with tracer.span('recovery', step=name, error=type(error).__name__) as span:
+                try:
+                    step()
+                except Exception as e:
+                    self.failures[name] += 1
+                    span.end('failed')
+                    print(f"Recovery step {name} failed: {str(e)}")
+                    continue
+                finally:
+                    self.seconds[name] += time.perf_counter() - started
+                span.end('ok')
+            # If the next check fails too, start one step further up
+            self.level = min(level, len(self.steps) - 1)
+            return name
+
+        # The caller keeps monitoring; its next error starts at the last step again
+        self.level = len(self.steps) - 1
+        raise RecoveryFailed(f"Every recovery step failed after {type(error).__name__}: {str(error)}")
+
+    def reset(self):
+        """A check went through: the next error starts from the cheapest step again"""
+        self.level = 0
+
+    def report(self):
+        """Print how often each step ran, failed and how long it took on average"""
+        if not any(self.counts.values()):
+            return
+        print("🩹 Recovery steps:")
+        for name in self.names:
+            count = self.counts[name]
+            average_ms = self.seconds[name] / count * 1000 if count else 0
+            print(f"   {name:<16} {count:>5} runs {self.failures[name]:>4} failed {average_ms:>8.0f} ms avg")
@@ -0,0 +1,182 @@
+"""Poll scheduling for the monitoring loop
+
+A scheduler decides how long to wait before the next availability check. The
+loop reports what each check saw through record(outcome), with outcome one of
+'sold_out', 'open', 'timeout' or 'error', and calls wait() between checks.
+"""
+import datetime
+import random
+import re
+import threading
+import time
+
+# Outcomes that count as failures for backoff
+FAILURE_OUTCOMES = {'timeout', 'error'}
+
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+def positive_seconds(value):
+    """Parse a poll interval, rejecting 0 and below (argparse type)"""
+    seconds = float(value)
+    if not seconds > 0:
+        raise ValueError(f"Interval must be more than 0 seconds, got {value}")
+    return seconds
+
+def positive_number(value):
+    """Parse a number above 0, such as a poll budget (argparse type)"""
+    number = float(value)
+    if not number > 0:
+        raise ValueError(f"Must be more than 0, got {value}")
+    return number
+
+def pause(seconds, stop_event=None):
+    """Sleep, waking early if the stop event is set"""
+    if seconds <= 0:
+        return
+    if stop_event:
+        stop_event.wait(seconds)
+    else:
+        time.sleep(seconds)
+
+class PollBudget:
+    """Token bucket capping polls per minute, shared by every date and monitor using it"""
+
+    def __init__(self, polls_per_minute):
+        if not polls_per_minute > 0:
+            raise ValueError(f"Poll budget must be more than 0 polls per minute, got {polls_per_minute}")
+        self.rate = polls_per_minute / 60.0
+        self.capacity = max(1.0, polls_per_minute / 6.0)  # Allow ten seconds' worth of burst
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, stop_event=None):
+        """Take one poll from the budget, waiting for it if necessary"""
+        while not (stop_event and stop_event.is_set()):
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                shortfall = (1 - self.tokens) / self.rate
+            pause(shortfall, stop_event)
+
+class BurstWindow:
+    """A daily time-of-day window with its own (usually sub-second) poll interval
+
+    weekdays (0 = Monday) limits the window to some days of the week.
+    """
+
+    def __init__(self, start, end, interval, weekdays=None):
+        self.start = start
+        self.end = end
+        self.interval = interval
+        self.weekdays = weekdays
+
+    @classmethod
+    def parse(cls, spec, default_interval=0.5):
+        """Parse 'HH:MM-HH:MM' or 'HH:MM-HH:MM@SECONDS'"""
+        match = re.match(r'^(\d{1,2}):(\d{2})-(\d{1,2}):(\d{2})(?:@([\d.]+))?$', spec.strip())
+        if not match:
+            raise ValueError(f"Invalid burst window '{spec}'. Use HH:MM-HH:MM or HH:MM-HH:MM@SECONDS")
+        start_h, start_m, end_h, end_m, interval = match.groups()
+        interval = float(interval) if interval else default_interval
+        if interval <= 0:
+            raise ValueError(f"Invalid burst window '{spec}'. The interval must be more than 0 seconds")
+        return cls(
+            datetime.time(int(start_h), int(start_m)),
+            datetime.time(int(end_h), int(end_m)),
+            interval,
+        )
+
+    def contains(self, now):
+        """Check whether a datetime falls inside the window (windows may wrap past midnight)"""
+        if self.weekdays is not None and now.weekday() not in self.weekdays:
+            return False
+        current = now.time()
+        if self.start <= self.end:
+            return self.start <= current < self.end
+        return current >= self.start or current < self.end
+
+    def __repr__(self):
+        days = ''
+        if self.weekdays is not None:
+            days = ','.join(WEEKDAYS[day] for day in sorted(self.weekdays)) + ' '
+        return f"{days}{self.start:%H:%M}-{self.end:%H:%M}@{self.interval}"
+
+class FixedScheduler:
+    """The original rhythm: a fixed wait after each sold-out check, none after errors
+
+    The browser loop reloads the page after an error, which paces the retry.
+    Loops without a reload wait retry_delay() instead.
+    """
+
+    def __init__(self, interval, budget=None):
+        if interval <= 0:
+            raise ValueError(f"Poll interval must be more than 0 seconds, got {interval}")
+        self.interval = interval
+        self.budget = budget
+        self.last_outcome = None
+
+    def record(self, outcome):
+        self.last_outcome = outcome
+
+    def next_delay(self, now=None):
+        return 0 if self.last_outcome in FAILURE_OUTCOMES else self.interval
+
+    def retry_delay(self, now=None):
+        """Wait after a failure when no page reload slows the retry down (never below the base interval)"""
+        return max(self.next_delay(now), self.interval)
+
+    def wait(self, stop_event=None, delay=None):
+        """Wait until the next check is due (after delay seconds if given)"""
+        pause(self.next_delay() if delay is None else delay, stop_event)
+        if self.budget:
+            self.budget.acquire(stop_event)
+
+class AdaptiveScheduler(FixedScheduler):
+    """Burst windows, exponential backoff with jitter, and an optional shared budget
+
+    Inside a burst window checks run at the window's interval. After repeated
+    timeouts or errors the wait doubles (up to backoff_max) with +/- jitter, so
+    a struggling server is not hammered. Otherwise the base interval applies.
+    """
+
+    def __init__(self, interval, burst_windows=(), backoff_max=120, jitter=0.2, budget=None):
+        super().__init__(interval, budget)
+        self.burst_windows = list(burst_windows)
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.failures = 0
+
+    def record(self, outcome):
+        super().record(outcome)
+        if outcome in FAILURE_OUTCOMES:
+            self.failures += 1
+        else:
+            self.failures = 0
+
+    def base_delay(self, now=None):
+        """Interval for the current time of day"""
+        now = now or datetime.datetime.now()
+        for window in self.burst_windows:
+            if window.contains(now):
+                return window.interval
+        return self.interval
+
+    def next_delay(self, now=None):
+        delay = self.base_delay(now)
+        if self.failures:
+            delay = min(self.backoff_max, max(delay, 1.0) * 2 ** (self.failures - 1))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+def create_scheduler(kind, interval, burst_specs=(), polls_per_minute=None, budget=None, burst_windows=()):
+    """Build a scheduler from command-line style settings plus any ready-made burst windows"""
+    if budget is None and polls_per_minute:
+        budget = PollBudget(polls_per_minute)
+    if kind == 'fixed':
+        return FixedScheduler(interval, budget)
+    windows = [BurstWindow.parse(spec) for spec in burst_specs or ()] + list(burst_windows)
+    return AdaptiveScheduler(interval, windows, budget=budget)
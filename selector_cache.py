@@ -0,0 +1,139 @@
+import json
+import os
+import threading
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+from tracing import tracer
+
+# Returns [index, element] for the first candidate that matches a usable element,
+# or null. Every candidate is tried in the same round trip.
+RESOLVE_SCRIPT = """
+const [candidates, requireClickable] = arguments;
+const usable = el => {
+    if (!requireClickable) return true;
+    const rect = el.getBoundingClientRect();
+    const style = window.getComputedStyle(el);
+    return (rect.width > 0 || rect.height > 0) && style.visibility !== 'hidden'
+        && style.display !== 'none' && !el.disabled;
+};
+for (let i = 0; i < candidates.length; i++) {
+    const [by, selector] = candidates[i];
+    let elements = [];
+    try {
+        if (by === 'xpath') {
+            const snapshot = document.evaluate(selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            for (let j = 0; j < snapshot.snapshotLength; j++) elements.push(snapshot.snapshotItem(j));
+        } else if (by === 'id') {
+            const element = document.getElementById(selector);
+            if (element) elements = [element];
+        } else {
+            elements = Array.from(document.querySelectorAll(selector));
+        }
+    } catch (e) {
+        continue;
+    }
+    const match = elements.find(usable);
+    if (match) return [i, match];
+}
+return null;
+"""
+
+# Consecutive timed-out lookups where the learned selector (and everything
+# else) found nothing before the entry is dropped
+STALE_AFTER_MISSES = 3
+
+class SelectorCache:
+    """Remember which selector last found an element, per page and element role
+
+    Learned selectors are tried first on the next lookup and persisted to a JSON
+    file, so a site change that only the last fallback survives costs one slow
+    lookup instead of one per run.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.misses = {}
+        self.entries = {}
+
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def learned(self, page, role):
+        """Return the learned (by, selector) for a page and role, if any"""
+        entry = self.entries.get(page, {}).get(role)
+        return tuple(entry) if entry else None
+
+    def ordered(self, page, role, candidates):
+        """Return the candidates with the learned selector moved to the front"""
+        learned = self.learned(page, role)
+        if learned in candidates:
+            return [learned] + [candidate for candidate in candidates if candidate != learned]
+        return list(candidates)
+
+    def resolve(self, driver, page, role, candidates, require_clickable=True):
+        """Find the element for a role in one script call, learning which selector won
+
+        Returns the element, or None when no candidate matches yet.
+        """
+        ordered = self.ordered(page, role, candidates)
+        with tracer.span('selector', page=page, role=role) as span:
+            result = driver.execute_script(RESOLVE_SCRIPT, [list(c) for c in ordered], require_clickable)
+
+            if result is None:
+                span.end('miss')
+                return None
+
+            index, element = result
+            span.set(index=index, learned=index == 0 and self.learned(page, role) is not None)
+            span.end('found')
+
+        self.misses.pop((page, role), None)
+        if ordered[index] != self.learned(page, role):
+            print(f"Learned selector for {role} on {page}: {ordered[index][1]}")
+            self._store(page, role, ordered[index])
+        return element
+
+    def wait_for(self, driver, page, role, candidates, timeout, poll_frequency=0.05, require_clickable=True):
+        """Poll resolve() until an element is found; raises TimeoutException otherwise"""
+        try:
+            return WebDriverWait(driver, timeout, poll_frequency=poll_frequency).until(
+                lambda d: self.resolve(d, page, role, candidates, require_clickable)
+            )
+        except TimeoutException:
+            self._miss(page, role)
+            raise
+
+    def evict(self, page, role):
+        """Forget the learned selector for a page and role"""
+        with self.lock:
+            if self.entries.get(page, {}).pop(role, None) is not None:
+                self._save()
+
+    def _miss(self, page, role):
+        if not self.learned(page, role):
+            return
+        key = (page, role)
+        self.misses[key] = self.misses.get(key, 0) + 1
+        if self.misses[key] >= STALE_AFTER_MISSES:
+            print(f"Evicting stale selector for {role} on {page}")
+            self.misses.pop(key, None)
+            self.evict(page, role)
+
+    def _store(self, page, role, candidate):
+        with self.lock:
+            self.entries.setdefault(page, {})[role] = list(candidate)
+            self._save()
+
+    def _save(self):
+        # Write to a temp file first so a crash never leaves a half-written cache
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"(Could not save selector cache: {e})")
@@ -0,0 +1,123 @@
+"""Gzip snapshots of what the checker saw, for replaying parser decisions offline
+
+With a snapshot directory configured, the checker saves the calendar, status
+and spot-select HTML whenever a watched date's status changes and whenever
+the monitoring loop or an HTTP poll hits an error. HTTP engine snapshots hold
+the calendar page the poller fetched as "calendars" and no status or spots.
+Each snapshot is one gzip JSON file:
+
+    {
+        "time": 1767225600.1, "reason": "transition", "url": "...",
+        "watched": ["2026-03-14", "2026-03-15"],
+        "shown": "2026-03-15",
+        "html": {"calendars": "...", "status": "...", "spots": "..."},
+        "status_text": "CAR PARKING: SOLD OUT",
+        "decisions": {"2026-03-14": {"cell": {...}, "state": "sold_out", "status": "...", "sold_out": true}}
+    }
+
+"shown" is the date whose status the status div holds (the last date clicked,
+null if none was). "decisions" is what the live checker concluded, each date
+from its own click. benchmarks/parser_corpus.py
+runs the parsing code over the saved HTML and reports any disagreement.
+Files are compressed and written by a background thread.
+"""
+import atexit
+import datetime
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+
+class SnapshotRecorder:
+    """Writes snapshots to a directory and remembers the last status of each date"""
+
+    def __init__(self, directory=None):
+        self.lock = threading.Lock()
+        self.directory = None
+        self.queue = None
+        self.writer = None
+        self.last_status = {}
+        self.configure(directory)
+        atexit.register(self.close)
+
+    def configure(self, directory):
+        """Start saving snapshots to directory (None turns recording off)"""
+        self.close()
+        if not directory:
+            return
+        os.makedirs(directory, exist_ok=True)
+        with self.lock:
+            self.directory = directory
+            self.queue = queue.Queue()
+            self.writer = threading.Thread(target=self._run, args=(self.queue,), daemon=True)
+            self.writer.start()
+
+    @property
+    def enabled(self):
+        return self.queue is not None
+
+    def changed(self, target_date, status):
+        """Remember a date's status; True if it differs from the last one (or is the first)"""
+        with self.lock:
+            previous = self.last_status.get(target_date)
+            self.last_status[target_date] = status
+        return previous != status
+
+    def save(self, reason, page, watched, decisions=None, shown=None):
+        """Queue a snapshot of a page (from the checker's SNAPSHOT_SCRIPT)"""
+        if self.queue is None:
+            return
+        self.queue.put({
+            'time': round(time.time(), 3),
+            'reason': reason,
+            'url': page.get('url'),
+            'watched': [target_date.isoformat() for target_date in watched],
+            'shown': shown.isoformat() if shown else None,
+            'html': {key: page.get(key, '') for key in ('calendars', 'status', 'spots')},
+            'status_text': page.get('statusText', ''),
+            'decisions': decisions or {},
+        })
+
+    def close(self):
+        """Write out queued snapshots and stop the writer"""
+        with self.lock:
+            pending, writer = self.queue, self.writer
+            self.queue = self.writer = None
+        if pending is not None:
+            pending.put(None)
+            writer.join()
+
+    def _run(self, pending):
+        directory = self.directory
+        while True:
+            snapshot = pending.get()
+            if snapshot is None:
+                return
+            stamp = datetime.datetime.fromtimestamp(snapshot['time']).strftime('%Y%m%d-%H%M%S-%f')
+            reason = ''.join(c if c.isalnum() or c in '-_' else '_' for c in snapshot['reason'])
+            path = os.path.join(directory, f"{stamp}-{reason}.json.gz")
+            try:
+                with gzip.open(path, 'wt', encoding='utf-8') as f:
+                    json.dump(snapshot, f)
+            except OSError as e:
+                print(f"(Could not save snapshot: {e})")
+
+# Shared recorder for the whole process
+recorder = SnapshotRecorder()
+
+def configure(directory):
+    """Point the shared recorder at a directory"""
+    recorder.configure(directory)
+
+def snapshot_paths(directory):
+    """Snapshot files in a directory, oldest first"""
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.json.gz')
+    )
+
+def load_snapshot(path):
+    """Read one snapshot file"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return json.load(f)
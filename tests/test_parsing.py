@@ -0,0 +1,72 @@
+import datetime
+
+import pytest
+
+from parsing import cart_has_item, data_date_day, find_watched_days, match_day_cell
+
+def cell(text, data_date=''):
+    return {'text': text, 'dataDate': data_date, 'className': '', 'title': ''}
+
+@pytest.mark.parametrize('value, expected', [
+    # Pacific midnight written in UTC
+    ('2026-03-08T08:00:00.000Z', datetime.date(2026, 3, 8)),
+    # Midnight east of UTC falls on the previous UTC day
+    ('2026-03-07T23:00:00.000Z', datetime.date(2026, 3, 8)),
+    ('2026-03-08T00:00:00+01:00', datetime.date(2026, 3, 8)),
+    ('2026-03-07T14:00:00Z', datetime.date(2026, 3, 8)),
+    # Dates and times without a zone are taken as written
+    ('2026-03-08', datetime.date(2026, 3, 8)),
+    ('2026-03-08T23:30:00', datetime.date(2026, 3, 8)),
+    (' 2026-03-08 ', datetime.date(2026, 3, 8)),
+])
+def test_data_date_day(value, expected):
+    assert data_date_day(value) == expected
+
+@pytest.mark.parametrize('value', [None, '', 'tomorrow', '2026-13-01', '2026-03-08Tnoon', '8'])
+def test_data_date_day_rejects_garbage(value):
+    assert data_date_day(value) is None
+
+def test_match_day_cell_by_text():
+    cells = [cell('7'), cell('8'), cell('9')]
+    assert match_day_cell(cells, datetime.date(2026, 3, 8)) is cells[1]
+
+def test_match_day_cell_skips_overflow_days():
+    # March's calendar opens with the last days of February
+    cells = [cell('28', '2026-02-28T08:00:00.000Z'), cell('1', '2026-03-01T08:00:00.000Z')]
+    cells += [cell(str(day), f'2026-03-{day:02d}T08:00:00.000Z') for day in range(2, 32)]
+    cells += [cell('1', '2026-04-01T07:00:00.000Z')]
+
+    assert match_day_cell(cells, datetime.date(2026, 3, 28)) is cells[28]
+    assert match_day_cell(cells, datetime.date(2026, 3, 1)) is cells[1]
+
+def test_match_day_cell_east_of_utc_data_date():
+    cells = [cell('7', '2026-03-06T23:00:00.000Z'), cell('8', '2026-03-07T23:00:00.000Z')]
+    assert match_day_cell(cells, datetime.date(2026, 3, 8)) is cells[1]
+
+def test_match_day_cell_falls_back_to_data_date():
+    cells = [cell('Sat', '2026-03-07T08:00:00.000Z'), cell('Sun', '2026-03-08T08:00:00.000Z')]
+    assert match_day_cell(cells, datetime.date(2026, 3, 8)) is cells[1]
+
+def test_match_day_cell_missing_day():
+    assert match_day_cell([cell('7'), cell('9')], datetime.date(2026, 3, 8)) is None
+
+def test_find_watched_days():
+    html = (
+        '<div id="calendar_2026-03">'
+        '<div data-date="2026-02-28T08:00:00.000Z">28</div>'
+        '<div class="day soldout" data-date="2026-03-28T07:00:00.000Z">28<span>SOLD OUT</span></div>'
+        '</div>'
+    )
+    cells = find_watched_days(html, [datetime.date(2026, 3, 28), datetime.date(2026, 4, 1)])
+
+    assert cells[datetime.date(2026, 3, 28)]['className'] == 'day soldout'
+    assert cells[datetime.date(2026, 4, 1)] is None
+
+@pytest.mark.parametrize('html, expected', [
+    ('<div><button id="btnCheckout">Checkout</button></div>', True),
+    ('<form><select name="spot"><option>Car</option></select></form>', True),
+    ('<select name="language"></select><p>Your cart is empty</p>', False),
+    ('<form action="/login/"><input name="username"></form>', False),
+])
+def test_cart_has_item(html, expected):
+    assert cart_has_item(html) is expected
@@ -0,0 +1,65 @@
+import pytest
+
+from recovery import Recovery, RecoveryFailed
+
+class SessionLost(Exception):
+    pass
+
+def ladder(failing=()):
+    """A Recovery over steps a, b, c that logs which ran; steps in failing raise"""
+    ran = []
+
+    def step(name):
+        def run():
+            ran.append(name)
+            if name in failing:
+                raise RuntimeError(f"{name} failed")
+        return name, run
+
+    recovery = Recovery([step('a'), step('b'), step('c')], start_levels={SessionLost: 'c'})
+    return recovery, ran
+
+def test_escalates_until_reset():
+    recovery, ran = ladder()
+    assert recovery.recover(ValueError()) == 'a'
+    assert recovery.recover(ValueError()) == 'b'
+    assert recovery.recover(ValueError()) == 'c'
+    assert recovery.recover(ValueError()) == 'c'
+
+    recovery.reset()
+    assert recovery.recover(ValueError()) == 'a'
+    assert ran == ['a', 'b', 'c', 'c', 'a']
+
+def test_start_level_by_error_type():
+    recovery, ran = ladder()
+    assert recovery.recover(SessionLost()) == 'c'
+    assert ran == ['c']
+
+def test_failed_step_escalates_within_one_error():
+    recovery, ran = ladder(failing={'a'})
+    assert recovery.recover(ValueError()) == 'b'
+    assert ran == ['a', 'b']
+    assert recovery.counts == {'a': 1, 'b': 1, 'c': 0}
+    assert recovery.failures == {'a': 1, 'b': 0, 'c': 0}
+
+def test_every_step_failing_raises_and_restarts_at_the_last_step():
+    recovery, ran = ladder(failing={'a', 'b', 'c'})
+    with pytest.raises(RecoveryFailed):
+        recovery.recover(ValueError())
+    assert ran == ['a', 'b', 'c']
+
+    # The caller keeps going; the next error tries the last step again
+    with pytest.raises(RecoveryFailed):
+        recovery.recover(ValueError())
+    assert ran == ['a', 'b', 'c', 'c']
+
+def test_report_lists_steps(capsys):
+    recovery, _ = ladder()
+    recovery.report()
+    assert capsys.readouterr().out == ''
+
+    recovery.recover(ValueError())
+    recovery.report()
+    out = capsys.readouterr().out
+    assert 'Recovery steps' in out
+    assert out.count(' runs ') == 3
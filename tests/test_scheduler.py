@@ -0,0 +1,133 @@
+import datetime
+
+import pytest
+
+import scheduler
+from scheduler import (
+    AdaptiveScheduler, BurstWindow, FixedScheduler, PollBudget, create_scheduler, positive_number, positive_seconds
+)
+
+class FakeClock:
+    """Stands in for time.monotonic and pause in the scheduler module"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.pauses = []
+
+    def monotonic(self):
+        return self.now
+
+    def pause(self, seconds, stop_event=None):
+        self.pauses.append(seconds)
+        self.now += max(0, seconds)
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(scheduler.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(scheduler, 'pause', clock.pause)
+    return clock
+
+def test_fixed_scheduler_waits_after_sold_out_only():
+    fixed = FixedScheduler(5)
+    fixed.record('sold_out')
+    assert fixed.next_delay() == 5
+    fixed.record('error')
+    assert fixed.next_delay() == 0
+    assert fixed.retry_delay() == 5
+
+def test_wait_uses_the_given_delay(clock):
+    fixed = FixedScheduler(5)
+    fixed.wait(delay=1.5)
+    fixed.wait()
+    assert clock.pauses == [1.5, 5]
+
+def test_adaptive_backoff_doubles_and_caps():
+    adaptive = AdaptiveScheduler(2, backoff_max=10, jitter=0)
+    delays = []
+    for _ in range(4):
+        adaptive.record('timeout')
+        delays.append(adaptive.next_delay())
+    assert delays == [2, 4, 8, 10]
+
+    adaptive.record('sold_out')
+    assert adaptive.next_delay() == 2
+
+def test_adaptive_backoff_starts_at_one_second_inside_bursts():
+    window = BurstWindow(datetime.time(0, 0), datetime.time(23, 59), 0.25)
+    adaptive = AdaptiveScheduler(5, [window], jitter=0)
+    adaptive.record('error')
+    assert adaptive.next_delay() == 1.0
+    assert adaptive.retry_delay() == 5
+
+def test_adaptive_jitter_stays_in_range():
+    adaptive = AdaptiveScheduler(10, jitter=0.2)
+    for _ in range(100):
+        assert 8 <= adaptive.next_delay() <= 12
+
+def test_burst_window_parse_and_contains():
+    window = BurstWindow.parse('09:55-11:00@0.5')
+    assert window.interval == 0.5
+    assert window.contains(datetime.datetime(2026, 3, 14, 10, 0))
+    assert not window.contains(datetime.datetime(2026, 3, 14, 11, 0))
+
+def test_burst_window_wraps_past_midnight_and_weekdays():
+    window = BurstWindow(datetime.time(23, 0), datetime.time(1, 0), 1, weekdays={5})
+    assert window.contains(datetime.datetime(2026, 3, 14, 23, 30))  # Saturday
+    assert window.contains(datetime.datetime(2026, 3, 14, 0, 30))
+    assert not window.contains(datetime.datetime(2026, 3, 15, 23, 30))  # Sunday
+    assert repr(window) == 'Sat 23:00-01:00@1'
+
+def test_base_delay_uses_burst_window():
+    adaptive = create_scheduler('adaptive', 5, ['09:00-10:00@0.5'])
+    assert adaptive.base_delay(datetime.datetime(2026, 3, 14, 9, 30)) == 0.5
+    assert adaptive.base_delay(datetime.datetime(2026, 3, 14, 10, 30)) == 5
+
+@pytest.mark.parametrize('spec', ['9-10', '09:00-10:00@0', '09:00-10:00@', 'soon'])
+def test_burst_window_parse_rejects(spec):
+    with pytest.raises(ValueError):
+        BurstWindow.parse(spec)
+
+@pytest.mark.parametrize('interval', [0, -1])
+def test_schedulers_reject_non_positive_intervals(interval):
+    with pytest.raises(ValueError):
+        create_scheduler('fixed', interval)
+    with pytest.raises(ValueError):
+        create_scheduler('adaptive', interval)
+
+def test_positive_seconds():
+    assert positive_seconds('0.5') == 0.5
+    for value in ('0', '-2', 'nan', 'fast'):
+        with pytest.raises(ValueError):
+            positive_seconds(value)
+
+@pytest.mark.parametrize('polls_per_minute', [0, -10])
+def test_budget_rejects_non_positive_rates(polls_per_minute):
+    with pytest.raises(ValueError):
+        PollBudget(polls_per_minute)
+    with pytest.raises(ValueError):
+        positive_number(str(polls_per_minute))
+
+def test_budget_allows_a_burst_then_paces(clock):
+    budget = PollBudget(60)  # One per second, ten seconds' worth of burst
+    for _ in range(10):
+        budget.acquire()
+    assert clock.pauses == []
+
+    budget.acquire()
+    assert clock.pauses == [pytest.approx(1.0)]
+
+def test_budget_refills_over_time(clock):
+    budget = PollBudget(60)
+    for _ in range(10):
+        budget.acquire()
+    clock.now += 3
+    for _ in range(3):
+        budget.acquire()
+    assert clock.pauses == []
+
+def test_scheduler_wait_takes_from_budget(clock):
+    fixed = FixedScheduler(1, budget=PollBudget(6))  # Capacity of one poll
+    fixed.wait()
+    fixed.wait()
+    assert clock.pauses == [1, 1, pytest.approx(9.0)]  # One poll per ten seconds, one second already passed
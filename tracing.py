@@ -0,0 +1,171 @@
+"""Lightweight phase tracing with JSONL output
+
+Each record is one line of JSON:
+
+    {"phase": "poll", "start": 1234.567, "duration_ms": 812.4, "outcome": "sold_out", "wall": 1767225600.1, ...}
+
+"start" is time.monotonic() when the span began; "wall" is the matching epoch
+time for lining traces up with logs. Tracing is off until configure() is given
+a path, and spans cost a couple of clock reads when it is off.
+
+Print per-phase percentiles of a trace file:
+
+    python tracing.py summary trace.jsonl
+"""
+import argparse
+import atexit
+import json
+import math
+import os
+import threading
+import time
+
+# Records buffered before they are written out
+FLUSH_EVERY = 50
+
+class Span:
+    """A timed phase; ends when its with-block exits unless end() was called first"""
+
+    def __init__(self, tracer, phase, attrs):
+        self.tracer = tracer
+        self.phase = phase
+        self.attrs = attrs
+        self.outcome = 'ok'
+        self.start = time.monotonic()
+        self.ended = False
+
+    def set(self, **attrs):
+        """Attach extra fields to the record"""
+        self.attrs.update(attrs)
+
+    def end(self, outcome=None):
+        """Close the span now with the given outcome"""
+        if self.ended:
+            return
+        self.ended = True
+        if outcome:
+            self.outcome = outcome
+        self.tracer.record(self.phase, time.monotonic() - self.start, self.outcome, start=self.start, **self.attrs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and not self.ended:
+            self.attrs['error'] = exc_type.__name__
+            self.end('error')
+        else:
+            self.end()
+        return False
+
+class Tracer:
+    """Collects span records and appends them to a JSONL file"""
+
+    def __init__(self, path=None):
+        self.lock = threading.Lock()
+        self.buffer = []
+        self.file = None
+        self.configure(path)
+        atexit.register(self.flush)
+
+    def configure(self, path):
+        """Start writing to path (None turns tracing off)"""
+        with self.lock:
+            self._flush_locked()
+            if self.file:
+                self.file.close()
+            self.file = open(path, 'a') if path else None
+
+    @property
+    def enabled(self):
+        return self.file is not None
+
+    def span(self, phase, **attrs):
+        """Time a phase: with tracer.span('login'): ..."""
+        return Span(self, phase, attrs)
+
+    def record(self, phase, duration, outcome='ok', start=None, **attrs):
+        """Record a phase that took duration seconds"""
+        if self.file is None:
+            return
+        entry = {
+            'phase': phase,
+            'start': round(start if start is not None else time.monotonic() - duration, 6),
+            'duration_ms': round(duration * 1000, 3),
+            'outcome': outcome,
+            'wall': round(time.time(), 3),
+            'pid': os.getpid(),
+        }
+        entry.update(attrs)
+        with self.lock:
+            self.buffer.append(entry)
+            if len(self.buffer) >= FLUSH_EVERY:
+                self._flush_locked()
+
+    def flush(self):
+        """Write out buffered records"""
+        with self.lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if self.file and self.buffer:
+            self.file.write(''.join(json.dumps(entry, default=str) + '\n' for entry in self.buffer))
+            self.file.flush()
+        self.buffer = []
+
+# Shared tracer for the whole process
+tracer = Tracer(os.getenv('CRYSTAL_TRACE_FILE'))
+
+def configure(path):
+    """Point the shared tracer at a JSONL file"""
+    tracer.configure(path)
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def load_records(paths):
+    """Read span records from JSONL files, skipping malformed lines"""
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+def summarize(records):
+    """Group records by phase: {phase: {'durations': sorted list, 'outcomes': {outcome: count}}}"""
+    phases = {}
+    for entry in records:
+        stats = phases.setdefault(entry['phase'], {'durations': [], 'outcomes': {}})
+        stats['durations'].append(entry['duration_ms'])
+        stats['outcomes'][entry['outcome']] = stats['outcomes'].get(entry['outcome'], 0) + 1
+    for stats in phases.values():
+        stats['durations'].sort()
+    return phases
+
+def print_summary(phases):
+    """Print count, p50/p95/p99 and outcomes per phase"""
+    print(f"{'phase':<28} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  outcomes")
+    for phase in sorted(phases):
+        durations = phases[phase]['durations']
+        outcomes = ', '.join(f"{name}={count}" for name, count in sorted(phases[phase]['outcomes'].items()))
+        print(f"{phase:<28} {len(durations):>7} {percentile(durations, 0.50):>9.1f} "
+              f"{percentile(durations, 0.95):>9.1f} {percentile(durations, 0.99):>9.1f}  {outcomes}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize checker trace files')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    summary = subparsers.add_parser('summary', help='Print p50/p95/p99 per phase')
+    summary.add_argument('files', nargs='+', help='JSONL trace files')
+    args = parser.parse_args()
+
+    if args.command == 'summary':
+        print_summary(summarize(load_records(args.files)))
+
+if __name__ == "__main__":
+    main()